@@ -3,6 +3,8 @@ from django.shortcuts import redirect
 from django.conf import settings
 from django.http import HttpResponse
 
+from insights import http_transport
+
 FACEBOOK_CLIENT_ID = settings.FB_APP_ID
 FACEBOOK_CLIENT_SECRET = settings.FB_APP_SECRET
 BASE_URL = settings.BASE_URL
@@ -39,7 +41,7 @@ def facebook_callback(request):
     }
 
     try:
-        r = requests.get(token_url, params=params)
+        r = http_transport.get(token_url, params=params)
         r.raise_for_status()
         access_token = r.json().get("access_token")
         if not access_token:
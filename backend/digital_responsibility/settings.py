@@ -37,6 +37,7 @@ INSTALLED_APPS = [
     'django.contrib.staticfiles',
     'rest_framework',
     'rest_framework.authtoken',
+    'insights',
 ]
 
 
@@ -131,6 +132,26 @@ from decouple import config
 FB_APP_ID = config("FB_APP_ID")
 FB_APP_SECRET = config("FB_APP_SECRET")
 
+# Celery
+# Reports are built by a separate worker process (the "worker" entry in
+# the Procfile; on Railway a second service using railway.worker.json).
+# CELERY_BROKER_URL must point at a Redis that the web and worker
+# services share; without a running worker, reports stay "pending".
+# Point CELERY_BROKER_URL at a local Redis in development; for tests use
+# CELERY_BROKER_URL=memory:// with CELERY_RESULT_BACKEND=cache+memory://
+# and CELERY_TASK_ALWAYS_EAGER=True to run tasks in-process.
+CELERY_BROKER_URL = config("CELERY_BROKER_URL", default="redis://localhost:6379/0")
+CELERY_RESULT_BACKEND = config("CELERY_RESULT_BACKEND", default=CELERY_BROKER_URL)
+CELERY_TASK_ALWAYS_EAGER = config("CELERY_TASK_ALWAYS_EAGER", default=False, cast=bool)
+CELERY_TASK_SERIALIZER = "json"
+CELERY_RESULT_SERIALIZER = "json"
+CELERY_ACCEPT_CONTENT = ["json"]
+CELERY_TASK_TRACK_STARTED = True
+CELERY_TASK_ACKS_LATE = True
+CELERY_WORKER_PREFETCH_MULTIPLIER = 1
+CELERY_RESULT_EXPIRES = 24 * 3600
+CELERY_BROKER_CONNECTION_RETRY_ON_STARTUP = True
+
 BASE_URL = "http://localhost:8000"       # Django backend URL
 FRONTEND_URL = "http://localhost:3000"   # React frontend URL
 SECURE_PROXY_SSL_HEADER = ('HTTP_X_FORWARDED_PROTO', 'https')
@@ -0,0 +1,227 @@
+# backend/insights/analysis_cache.py
+
+import os
+import json
+import time
+import logging
+import threading
+import unicodedata
+from collections import OrderedDict
+from datetime import datetime
+
+import xxhash
+
+from insights.label_maps import SENTIMENT_MAP, TOXICITY_MAP, MISINFO_MAP
+
+logger = logging.getLogger(__name__)
+
+MODEL_VERSION = os.getenv("ANALYSIS_MODEL_VERSION", "Anjanie/cyberhunk")
+MEMORY_MAX_BYTES = int(os.getenv("ANALYSIS_CACHE_MEMORY_BYTES", str(16 * 1024 * 1024)))
+SHARED_TTL_SECONDS = int(os.getenv("ANALYSIS_CACHE_TTL", str(7 * 24 * 3600)))
+SHARED_COLLECTION = os.getenv("ANALYSIS_CACHE_COLLECTION", "analysis_cache")
+SHARED_RETRY_SECONDS = 60
+
+
+# Keys
+
+def _label_map_version() -> str:
+    maps = json.dumps([SENTIMENT_MAP, TOXICITY_MAP, MISINFO_MAP], sort_keys=True)
+    return xxhash.xxh3_64_hexdigest(maps.encode("utf-8"))
+
+
+CACHE_VERSION = f"{MODEL_VERSION}:{_label_map_version()}"
+
+
+def normalize_text(text: str) -> str:
+    """Unicode-normalize and collapse whitespace so trivial variants share a key."""
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+def cache_key(text: str, version: str = CACHE_VERSION) -> str:
+    return xxhash.xxh3_128_hexdigest(f"{version}\0{normalize_text(text)}".encode("utf-8"))
+
+
+# In-process Tier
+
+class SizedLRU:
+    """Thread-safe LRU bounded by the approximate byte size of its values."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _sizeof(key: str, value) -> int:
+        return len(key) + len(json.dumps(value, default=str))
+
+    def get(self, key: str):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            self._data.move_to_end(key)
+            return entry[0]
+
+    def set(self, key: str, value):
+        size = self._sizeof(key, value)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self.bytes -= old[1]
+            self._data[key] = (value, size)
+            self.bytes += size
+            while self.bytes > self.max_bytes:
+                _, (_, evicted) = self._data.popitem(last=False)
+                self.bytes -= evicted
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.bytes = 0
+
+    def __len__(self):
+        return len(self._data)
+
+
+# Two-tier Cache
+
+class TwoTierCache:
+    """
+    In-process LRU in front of a Mongo collection shared by every
+    gunicorn and Celery worker. Entries in Mongo expire through a TTL
+    index on ``created_at``. The shared tier is best-effort: if Mongo is
+    unreachable the cache degrades to the local tier only.
+    """
+
+    def __init__(self, collection_name: str, ttl_seconds: int, max_bytes: int):
+        self.collection_name = collection_name
+        self.ttl_seconds = ttl_seconds
+        self.memory = SizedLRU(max_bytes)
+        self._collection = None
+        self._disabled_until = 0.0
+        self._lock = threading.Lock()
+        self._stats = {"memory_hits": 0, "shared_hits": 0, "misses": 0, "writes": 0, "errors": 0}
+
+    def _count(self, name: str, n: int = 1):
+        with self._lock:
+            self._stats[name] += n
+
+    def _shared(self):
+        if self._collection is not None:
+            return self._collection
+        if time.monotonic() < self._disabled_until:
+            return None
+        try:
+            from insights.mongo_client import db
+
+            collection = db[self.collection_name]
+            collection.create_index("created_at", expireAfterSeconds=self.ttl_seconds)
+            self._collection = collection
+        except Exception as e:
+            logger.warning(f"[CACHE] Shared tier unavailable ({self.collection_name}): {e}")
+            self._disabled_until = time.monotonic() + SHARED_RETRY_SECONDS
+        return self._collection
+
+    def _shared_failed(self, e: Exception):
+        logger.warning(f"[CACHE] Shared tier error ({self.collection_name}): {e}")
+        self._count("errors")
+        self._collection = None
+        self._disabled_until = time.monotonic() + SHARED_RETRY_SECONDS
+
+    def get(self, key: str):
+        value = self.memory.get(key)
+        if value is not None:
+            self._count("memory_hits")
+            return value
+
+        collection = self._shared()
+        if collection is not None:
+            try:
+                doc = collection.find_one({"_id": key}, {"value": 1})
+            except Exception as e:
+                self._shared_failed(e)
+                doc = None
+            if doc is not None:
+                self._count("shared_hits")
+                self.memory.set(key, doc["value"])
+                return doc["value"]
+
+        self._count("misses")
+        return None
+
+    def get_many(self, keys: list) -> dict:
+        found = {}
+        missing = []
+        for key in keys:
+            value = self.memory.get(key)
+            if value is not None:
+                found[key] = value
+            else:
+                missing.append(key)
+        self._count("memory_hits", len(found))
+
+        collection = self._shared() if missing else None
+        if collection is not None:
+            try:
+                for doc in collection.find({"_id": {"$in": missing}}, {"value": 1}):
+                    found[doc["_id"]] = doc["value"]
+                    self.memory.set(doc["_id"], doc["value"])
+                    self._count("shared_hits")
+            except Exception as e:
+                self._shared_failed(e)
+
+        self._count("misses", len(set(keys)) - len(found))
+        return found
+
+    def set(self, key: str, value):
+        self.memory.set(key, value)
+        collection = self._shared()
+        if collection is None:
+            return
+        try:
+            collection.replace_one(
+                {"_id": key},
+                {"_id": key, "value": value, "created_at": datetime.utcnow()},
+                upsert=True,
+            )
+            self._count("writes")
+        except Exception as e:
+            self._shared_failed(e)
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+        lookups = stats["memory_hits"] + stats["shared_hits"] + stats["misses"]
+        stats.update({
+            "hit_rate": round((stats["memory_hits"] + stats["shared_hits"]) / lookups, 4) if lookups else 0.0,
+            "memory_entries": len(self.memory),
+            "memory_bytes": self.memory.bytes,
+        })
+        return stats
+
+
+analysis_cache = TwoTierCache(SHARED_COLLECTION, SHARED_TTL_SECONDS, MEMORY_MAX_BYTES)
+
+
+def get_cached_analysis(text: str):
+    return analysis_cache.get(cache_key(text))
+
+
+def get_cached_analyses(texts: list) -> dict:
+    """Map text -> cached result for every text that is already cached."""
+    keys = {text: cache_key(text) for text in texts}
+    found = analysis_cache.get_many(list(set(keys.values())))
+    return {text: found[key] for text, key in keys.items() if key in found}
+
+
+def store_analysis(text: str, result: dict):
+    if result:
+        analysis_cache.set(cache_key(text), result)
+
+
+def cache_stats() -> dict:
+    return {"version": CACHE_VERSION, **analysis_cache.stats()}
@@ -0,0 +1,326 @@
+# backend/insights/cascade.py
+
+import os
+import re
+import random
+import logging
+import threading
+from pathlib import Path
+
+import numpy as np
+import xxhash
+
+from insights.gradio_models import emoji_sentiment
+from insights.inference import BACKENDS
+from insights.lexicon import places
+from insights.pii import find_values
+from insights.services import is_emoji_only
+
+logger = logging.getLogger(__name__)
+
+CASCADE_MODEL_PATH = Path(os.getenv(
+    "CASCADE_MODEL_PATH",
+    Path(__file__).resolve().parent.parent / "optimized_models" / "cascade.npz",
+))
+# Tier 1 answers only when every head is at least this sure
+CASCADE_THRESHOLD = float(os.getenv("CASCADE_THRESHOLD", "0.9"))
+# Share of confident tier-1 answers also sent to the remote model to
+# measure agreement
+CASCADE_AUDIT_RATE = float(os.getenv("CASCADE_AUDIT_RATE", "0.05"))
+# Backend that handles escalated texts (see insights.inference.BACKENDS)
+CASCADE_FALLBACK = os.getenv("CASCADE_FALLBACK", "gradio")
+if CASCADE_FALLBACK == "cascade" or CASCADE_FALLBACK not in BACKENDS:
+    raise ValueError(
+        f"CASCADE_FALLBACK={CASCADE_FALLBACK!r} must be one of "
+        f"{sorted(name for name in BACKENDS if name != 'cascade')}"
+    )
+
+HASH_DIM = 2 ** 18
+SENTIMENT_CLASSES = ("negative", "neutral", "positive")
+HEADS = ("sentiment", "toxic", "misinformation")
+
+
+def _result(label="neutral", toxic=False, misinformation=False, text="") -> dict:
+    return {
+        "label": label,
+        "toxic": toxic,
+        "misinformation": misinformation,
+        "entities": [
+            {"entity": "LOCATION", "word": place}
+            for place in dict.fromkeys(value for _, _, value in places.find_all(text))
+        ],
+        "phones": find_values(text, "phone"),
+        "emails": find_values(text, "email"),
+    }
+
+
+# -----------------------------
+# Tier 0: rules
+# -----------------------------
+URL_PATTERN = re.compile(r"(?:https?://|www\.)\S+", re.IGNORECASE)
+HANDLE_PATTERN = re.compile(r"[@#]\w+")
+# "in Kuruwita": a place the gazetteer does not know, leave it to the remote NER
+LOCATION_HINT = re.compile(r"\b(?:in|at|from|to|near|visiting)\s+[A-Z][a-z]+")
+
+
+def tier0(text: str):
+    """Answer trivially safe inputs without any model, or return None."""
+    if not text or not text.strip():
+        return _result()
+
+    if is_emoji_only(text):
+        return _result(label=emoji_sentiment(text) or "neutral")
+
+    # Nothing left once links, mentions and hashtags are removed
+    residue = HANDLE_PATTERN.sub(" ", URL_PATTERN.sub(" ", text))
+    if not any(ch.isalnum() for ch in residue):
+        return _result(text=text)
+    return None
+
+
+# -----------------------------
+# Tier 1: hashed n-gram classifier
+# -----------------------------
+TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]", re.UNICODE)
+
+
+def hashed_features(text: str, dim: int = HASH_DIM) -> tuple:
+    """
+    Word unigrams and bigrams hashed into ``dim`` buckets. Returns
+    ``(indices, values)`` with the values L2-normalized.
+    """
+    tokens = TOKEN_PATTERN.findall(URL_PATTERN.sub(" URL ", text.lower()))
+    grams = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+    if not grams:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+
+    hashed = np.fromiter(
+        (xxhash.xxh32_intdigest(g.encode("utf-8")) % dim for g in grams),
+        dtype=np.int64, count=len(grams),
+    )
+    indices, counts = np.unique(hashed, return_counts=True)
+    values = counts.astype(np.float32)
+    return indices, values / np.linalg.norm(values)
+
+
+def _softmax(z):
+    z = z - z.max()
+    e = np.exp(z)
+    return e / e.sum()
+
+
+def _sigmoid(z):
+    return 1.0 / (1.0 + np.exp(-z))
+
+
+class HashedLinearModel:
+    """
+    Multinomial sentiment head plus logistic toxic and misinformation
+    heads over shared hashed features. Trained offline with
+    ``manage.py train_cascade``.
+    """
+
+    def __init__(self, dim: int = HASH_DIM):
+        self.dim = dim
+        self.sentiment_w = np.zeros((dim, len(SENTIMENT_CLASSES)), dtype=np.float32)
+        self.sentiment_b = np.zeros(len(SENTIMENT_CLASSES), dtype=np.float32)
+        self.toxic_w = np.zeros(dim, dtype=np.float32)
+        self.toxic_b = np.float32(0)
+        self.misinfo_w = np.zeros(dim, dtype=np.float32)
+        self.misinfo_b = np.float32(0)
+
+    def predict(self, text: str) -> dict:
+        """Probabilities per head: sentiment distribution, P(toxic), P(misinformation)."""
+        idx, val = hashed_features(text, self.dim)
+        return {
+            "sentiment": _softmax(val @ self.sentiment_w[idx] + self.sentiment_b),
+            "toxic": float(_sigmoid(val @ self.toxic_w[idx] + self.toxic_b)),
+            "misinformation": float(_sigmoid(val @ self.misinfo_w[idx] + self.misinfo_b)),
+        }
+
+    def fit(self, samples: list, epochs: int = 5, lr: float = 0.5, l2: float = 1e-6, seed: int = 0):
+        """
+        SGD over ``samples`` of {"text", "label", "toxic", "misinformation"},
+        e.g. stored analyses from the remote model.
+        """
+        rng = random.Random(seed)
+        features = [hashed_features(s["text"], self.dim) for s in samples]
+        targets = [
+            (SENTIMENT_CLASSES.index(s.get("label", "neutral")) if s.get("label") in SENTIMENT_CLASSES else 1,
+             float(bool(s.get("toxic"))), float(bool(s.get("misinformation"))))
+            for s in samples
+        ]
+        order = list(range(len(samples)))
+        for _ in range(epochs):
+            rng.shuffle(order)
+            for i in order:
+                idx, val = features[i]
+                if not len(idx):
+                    continue
+                sentiment, toxic, misinfo = targets[i]
+
+                grad = _softmax(val @ self.sentiment_w[idx] + self.sentiment_b)
+                grad[sentiment] -= 1.0
+                self.sentiment_w[idx] -= lr * (np.outer(val, grad) + l2 * self.sentiment_w[idx])
+                self.sentiment_b -= lr * grad
+
+                g = _sigmoid(val @ self.toxic_w[idx] + self.toxic_b) - toxic
+                self.toxic_w[idx] -= lr * (g * val + l2 * self.toxic_w[idx])
+                self.toxic_b -= lr * g
+
+                g = _sigmoid(val @ self.misinfo_w[idx] + self.misinfo_b) - misinfo
+                self.misinfo_w[idx] -= lr * (g * val + l2 * self.misinfo_w[idx])
+                self.misinfo_b -= lr * g
+        return self
+
+    def save(self, path: Path = CASCADE_MODEL_PATH):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        np.savez_compressed(
+            path, dim=self.dim,
+            sentiment_w=self.sentiment_w, sentiment_b=self.sentiment_b,
+            toxic_w=self.toxic_w, toxic_b=self.toxic_b,
+            misinfo_w=self.misinfo_w, misinfo_b=self.misinfo_b,
+        )
+
+    @classmethod
+    def load(cls, path: Path = CASCADE_MODEL_PATH) -> "HashedLinearModel":
+        with np.load(path) as data:
+            model = cls(int(data["dim"]))
+            for name in ("sentiment_w", "sentiment_b", "toxic_w", "toxic_b", "misinfo_w", "misinfo_b"):
+                setattr(model, name, data[name])
+        return model
+
+
+_model = None
+_model_failed = False
+_model_lock = threading.Lock()
+
+
+def get_cascade_model():
+    global _model, _model_failed
+    if _model is None and not _model_failed:
+        with _model_lock:
+            if _model is None and not _model_failed:
+                try:
+                    _model = HashedLinearModel.load(CASCADE_MODEL_PATH)
+                    logger.info(f"Cascade model loaded: {CASCADE_MODEL_PATH}")
+                except Exception as e:
+                    logger.warning(f"[CASCADE] No tier-1 model, escalating everything past tier 0: {e}")
+                    _model_failed = True
+    return _model
+
+
+def tier1(text: str, threshold: float = CASCADE_THRESHOLD):
+    """Answer from the hashed model when every head is confident, else None."""
+    model = get_cascade_model()
+    if model is None:
+        return None
+    if LOCATION_HINT.search(text) and not places.find_all(text):
+        return None
+
+    probs = model.predict(text)
+    sentiment = probs["sentiment"]
+    confident = (
+        sentiment.max() >= threshold
+        and max(probs["toxic"], 1 - probs["toxic"]) >= threshold
+        and max(probs["misinformation"], 1 - probs["misinformation"]) >= threshold
+    )
+    if not confident:
+        return None
+
+    label = emoji_sentiment(text) or SENTIMENT_CLASSES[int(sentiment.argmax())]
+    return _result(label, probs["toxic"] >= 0.5, probs["misinformation"] >= 0.5, text)
+
+
+# -----------------------------
+# Metrics
+# -----------------------------
+class CascadeStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.counts = {"texts": 0, "tier0": 0, "tier1": 0, "escalated": 0, "audited": 0}
+            self.agreed = {head: 0 for head in HEADS}
+
+    def record(self, tier0=0, tier1=0, escalated=0):
+        with self._lock:
+            self.counts["texts"] += tier0 + tier1 + escalated
+            self.counts["tier0"] += tier0
+            self.counts["tier1"] += tier1
+            self.counts["escalated"] += escalated
+
+    def record_audit(self, local: dict, remote: dict):
+        with self._lock:
+            self.counts["audited"] += 1
+            self.agreed["sentiment"] += local["label"] == remote.get("label")
+            self.agreed["toxic"] += local["toxic"] == bool(remote.get("toxic"))
+            self.agreed["misinformation"] += local["misinformation"] == bool(remote.get("misinformation"))
+
+    def as_dict(self) -> dict:
+        with self._lock:
+            counts, agreed = dict(self.counts), dict(self.agreed)
+        texts, audited = counts["texts"], counts["audited"]
+        counts["escalation_rate"] = round(counts["escalated"] / texts, 4) if texts else 0.0
+        counts["agreement"] = {
+            head: round(agreed[head] / audited, 4) if audited else None for head in HEADS
+        }
+        return counts
+
+
+stats = CascadeStats()
+
+
+def cascade_stats() -> dict:
+    return stats.as_dict()
+
+
+# -----------------------------
+# Entry Points
+# -----------------------------
+def analyze_texts_cascade(texts: list) -> list:
+    """
+    Rules first, then the hashed classifier, and only uncertain texts go
+    to the CASCADE_FALLBACK backend. A random CASCADE_AUDIT_RATE share of
+    confident tier-1 answers rides along to the remote model to track
+    agreement; those texts get the remote answer.
+    """
+    from insights.inference import run_inference_many
+
+    results = [None] * len(texts)
+    local, escalate, audit = {}, [], []
+    n_tier0 = n_tier1 = 0
+
+    for i, text in enumerate(texts):
+        result = tier0(text)
+        if result is not None:
+            results[i] = result
+            n_tier0 += 1
+            continue
+        result = tier1(text)
+        if result is None:
+            escalate.append(i)
+        elif random.random() < CASCADE_AUDIT_RATE:
+            local[i] = result
+            audit.append(i)
+        else:
+            results[i] = result
+            n_tier1 += 1
+
+    stats.record(tier0=n_tier0, tier1=n_tier1 + len(audit), escalated=len(escalate))
+
+    remote_idx = escalate + audit
+    if remote_idx:
+        remote = run_inference_many([texts[i] for i in remote_idx], CASCADE_FALLBACK)
+        for i, result in zip(remote_idx, remote):
+            results[i] = result
+            if i in local and not result.get("error"):
+                stats.record_audit(local[i], result)
+    return results
+
+
+def analyze_text_cascade(text: str) -> dict:
+    return analyze_texts_cascade([text])[0]
@@ -2,10 +2,16 @@
 
 from gradio_client import Client, ClientException, NetworkError
 import os
+import json
+import time
+import queue
 import logging
-from functools import lru_cache
+import threading
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
 
 from insights.label_maps import SENTIMENT_MAP, TOXICITY_MAP, MISINFO_MAP
+from insights.analysis_cache import get_cached_analysis, get_cached_analyses, store_analysis
+from insights.inference import InferenceUnavailable, empty_result, error_result
 
 logger = logging.getLogger(__name__)
 _client = None
@@ -38,64 +44,241 @@ def get_gradio_client():
         logger.info("Gradio client initialized WITHOUT auth (public Space).")
     return _client
 
-# Cached Gradio Analysis
+# Gradio Results
 
-@lru_cache(maxsize=2048)
-def analyze_text_gradio_cached(text: str) -> dict:
-    return analyze_text_gradio(text)
+def _normalize_result(text: str, raw) -> dict:
+    """Map the Space's raw labels onto our result schema."""
+    if not isinstance(raw, dict):
+        raise ValueError(f"Unexpected Gradio response type: {type(raw).__name__}")
+
+    # Sentiment
+    sentiment_raw = raw.get("sentiment")
+    sentiment = SENTIMENT_MAP.get(sentiment_raw, "neutral")
+    emoji_override = emoji_sentiment(text)
+    if emoji_override:
+        sentiment = emoji_override
+
+    # Toxicity
+    toxicity_raw = raw.get("toxicity")
+    toxic = TOXICITY_MAP.get(toxicity_raw, False)
+
+    # Misinformation
+    misinfo_raw = raw.get("misinformation")
+    misinformation = MISINFO_MAP.get(misinfo_raw, False)
+
+    # Entities & Personal Info
+    entities = raw.get("entities", [])
+    phones = raw.get("phones", [])
+    emails = raw.get("emails", [])
+
+    return {
+        "label": sentiment,
+        "toxic": toxic,
+        "misinformation": misinformation,
+        "entities": entities,
+        "phones": phones,
+        "emails": emails,
+    }
+
+
+# Batched Gradio Requests
+
+# Set (e.g. "/analyze_batch") only if the Space exposes a batch
+# endpoint; otherwise every text is its own /analyze_text request
+BATCH_API_NAME = os.getenv("GRADIO_BATCH_API", "")
+BATCH_MAX_SIZE = int(os.getenv("GRADIO_BATCH_MAX_SIZE", "16"))
+BATCH_WAIT_MS = float(os.getenv("GRADIO_BATCH_WAIT_MS", "10"))
+# One worker per gunicorn thread keeps the Space called as concurrently
+# as it was before batching, even when it has to fall back to one
+# request per text
+GUNICORN_THREADS = int(os.getenv("GUNICORN_THREADS", "4"))
+BATCH_WORKERS = int(os.getenv("GRADIO_BATCH_WORKERS", str(GUNICORN_THREADS)))
+# Texts waiting for a worker; submit fails fast beyond this
+BATCH_QUEUE_SIZE = int(os.getenv("GRADIO_BATCH_QUEUE_SIZE", "1024"))
+PREDICT_TIMEOUT = 30
+
+_batch_endpoint_missing = not BATCH_API_NAME
+
+
+def _client_or_raise():
+    client = get_gradio_client()
+    if not client:
+        raise InferenceUnavailable("Gradio client not initialized")
+    return client
+
+
+def _predict_single(text: str) -> dict:
+    raw = _client_or_raise().predict(text=text, api_name="/analyze_text", timeout=PREDICT_TIMEOUT)
+    return _normalize_result(text, raw)
+
+
+def _normalize_or_error(text: str, raw):
+    try:
+        return _normalize_result(text, raw)
+    except ValueError as e:
+        return e
+
+
+def _predict_each(texts: list) -> list:
+    """One /analyze_text call per text; a failing text yields its exception."""
+    results = []
+    for text in texts:
+        try:
+            results.append(_predict_single(text))
+        except Exception as e:
+            results.append(e)
+    return results
+
+
+def _predict_batch(texts: list) -> list:
+    """
+    Send ``texts`` to the Space's batch endpoint in one request.
+    Falls back to one /analyze_text call per text if the batch
+    endpoint is not configured, missing or answers with the wrong
+    shape. A text that failed gets the exception it raised (a
+    ValueError for a malformed item) in place of its result.
+    """
+    global _batch_endpoint_missing
+    if len(texts) == 1 or _batch_endpoint_missing:
+        return _predict_each(texts)
+
+    client = _client_or_raise()
+    try:
+        raw = client.predict(
+            texts=json.dumps(texts),
+            api_name=BATCH_API_NAME,
+            timeout=PREDICT_TIMEOUT,
+        )
+        if isinstance(raw, str):
+            raw = json.loads(raw)
+        if isinstance(raw, list) and len(raw) == len(texts):
+            return [_normalize_or_error(t, r) for t, r in zip(texts, raw)]
+        logger.warning(
+            f"[GRADIO BATCH] Unexpected batch response, falling back: {type(raw)}"
+        )
+    except (ClientException, NetworkError, TimeoutError):
+        raise
+    except Exception as e:
+        # Stop batching so the workers call /analyze_text in parallel
+        _batch_endpoint_missing = True
+        logger.warning(f"[GRADIO BATCH] Batch endpoint unavailable, sending texts one by one: {e}")
+
+    return _predict_each(texts)
+
+
+class GradioBatcher:
+    """
+    Collects texts from concurrent callers (gunicorn threads, Celery
+    tasks) for up to ``wait_ms`` or ``max_size`` items and sends them
+    to the Space as one batched request. Each caller gets a Future
+    resolving to its own result.
+    """
+
+    def __init__(self, max_size=BATCH_MAX_SIZE, wait_ms=BATCH_WAIT_MS, workers=BATCH_WORKERS,
+                 queue_size=BATCH_QUEUE_SIZE):
+        self.max_size = max(1, max_size)
+        self.wait = max(0.0, wait_ms) / 1000.0
+        self.workers = max(1, workers)
+        self.queue_size = max(1, queue_size)
+        self._lock = threading.Lock()
+        self._pid = None
+        self._queue = None
+
+    def _ensure_started(self):
+        # Threads do not survive fork, so each process starts its own.
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._queue = queue.Queue(maxsize=self.queue_size)
+            for i in range(self.workers):
+                threading.Thread(
+                    target=self._run,
+                    args=(self._queue,),
+                    name=f"gradio-batcher-{i}",
+                    daemon=True,
+                ).start()
+            self._pid = os.getpid()
+
+    def submit(self, text: str) -> Future:
+        self._ensure_started()
+        future = Future()
+        try:
+            self._queue.put_nowait((text, future))
+        except queue.Full:
+            future.set_exception(InferenceUnavailable("Gradio batch queue is full"))
+        return future
+
+    def _collect(self, q) -> list:
+        batch = [q.get()]
+        max_size = 1 if _batch_endpoint_missing else self.max_size
+        deadline = time.monotonic() + self.wait
+        while len(batch) < max_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(q.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self, q):
+        while True:
+            batch = self._collect(q)
+            texts = [text for text, _ in batch]
+            try:
+                results = _predict_batch(texts)
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+            for (text, future), result in zip(batch, results):
+                if isinstance(result, Exception):
+                    future.set_exception(result)
+                    continue
+                future.set_result(result)
+                store_analysis(text, result)
 
-def analyze_text_gradio(text: str) -> dict:
-    if not text or not text.strip():
-        return {
-            "label": "neutral",
-            "toxic": False,
-            "misinformation": False,
-            "entities": [], "phones": [], "emails": []
-        }
 
+_batcher = GradioBatcher()
+
+
+def analyze_texts_gradio(texts: list) -> list:
+    """
+    Analyze many texts. Cached texts skip inference; the rest share
+    batched requests, with duplicates sent only once.
+    """
+    pending = {t for t in texts if t and t.strip()}
+    cached = get_cached_analyses(list(pending))
+    futures = {t: _batcher.submit(t) for t in pending if t not in cached}
+    resolved = {t: _resolve(f) for t, f in futures.items()}
+    resolved.update(cached)
+    return [resolved.get(text) or empty_result() for text in texts]
+
+
+def _resolve(future: Future) -> dict:
+    """The text's result, or an ``error_result`` if the Space did not answer."""
     try:
-        client = get_gradio_client()
-        if not client:
-            logger.warning("[GRADIO ERROR] Client not initialized.")
-            return {}
-
-        raw = client.predict(text=text, api_name="/analyze_text", timeout=30)
-        if not isinstance(raw, dict):
-            logger.warning(f"[GRADIO ERROR] Unexpected response type: {type(raw)}")
-            return {}
-
-        # Sentiment
-        sentiment_raw = raw.get("sentiment")
-        sentiment = SENTIMENT_MAP.get(sentiment_raw, "neutral")
-        emoji_override = emoji_sentiment(text)
-        if emoji_override:
-            sentiment = emoji_override
-
-        # Toxicity
-        toxicity_raw = raw.get("toxicity")
-        toxic = TOXICITY_MAP.get(toxicity_raw, False)
-
-        # Misinformation
-        misinfo_raw = raw.get("misinformation")
-        misinformation = MISINFO_MAP.get(misinfo_raw, False)
-
-        # Entities & Personal Info
-        entities = raw.get("entities", [])
-        phones = raw.get("phones", [])
-        emails = raw.get("emails", [])
-
-        return {
-            "label": sentiment,
-            "toxic": toxic,
-            "misinformation": misinformation,
-            "entities": entities,
-            "phones": phones,
-            "emails": emails,
-        }
-
-    except (ClientException, NetworkError, TimeoutError) as e:
-        logger.error(f"[GRADIO TIMEOUT] {e}")
-        return {"label": "neutral", "toxic": False, "misinformation": False, "entities": [], "phones": [], "emails": []}
+        return future.result(timeout=PREDICT_TIMEOUT * 2)
+    except (TimeoutError, FutureTimeoutError):
+        logger.error("[GRADIO TIMEOUT] No result within the deadline")
+        return error_result("timeout")
+    except (ClientException, NetworkError, InferenceUnavailable) as e:
+        logger.error(f"[GRADIO ERROR] {e}")
+        return error_result("unavailable")
     except Exception as e:
         logger.error(f"[GRADIO ERROR] {e}")
-        return {"label": "neutral", "toxic": False, "misinformation": False, "entities": [], "phones": [], "emails": []}
\ No newline at end of file
+        return error_result("failed")
+
+
+def analyze_text_gradio(text: str) -> dict:
+    if not text or not text.strip():
+        return empty_result()
+
+    cached = get_cached_analysis(text)
+    if cached is not None:
+        return cached
+
+    return _resolve(_batcher.submit(text))
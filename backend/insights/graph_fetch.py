@@ -0,0 +1,228 @@
+# backend/insights/graph_fetch.py
+
+import os
+import json
+import asyncio
+import logging
+
+import httpx
+
+from insights import http_transport
+
+logger = logging.getLogger(__name__)
+
+GRAPH_URL = "https://graph.facebook.com/v19.0"
+GRAPH_CONCURRENCY = int(os.getenv("GRAPH_CONCURRENCY", "5"))
+POST_FIELDS = "message,story,status_type,created_time,updated_time,object_id"
+COMMENT_FIELDS = "message,created_time"
+POSTS_PAGE_SIZE = int(os.getenv("GRAPH_PAGE_SIZE", "25"))
+BATCH_SIZE = 50  # Graph API limit per batch request
+
+
+class GraphAPIError(Exception):
+    pass
+
+
+class GraphFetcher:
+    """
+    Async Graph API reader for one access token.
+
+    Comments are pulled inline with each page of posts through field
+    expansion, and the bodies of every shared story on a page are
+    resolved with a single Graph batch request, so a page of posts costs
+    one or two HTTP calls. Pages are fetched sequentially (each needs the
+    previous cursor) but overlap with the resolution of the page before,
+    with at most ``concurrency`` requests in flight for the token.
+    """
+
+    def __init__(self, token: str, client: httpx.AsyncClient, concurrency: int = GRAPH_CONCURRENCY):
+        self.token = token
+        self.client = client
+        self._semaphore = asyncio.Semaphore(max(1, concurrency))
+        self._shared_cache = {}
+
+    async def get(self, url: str, params: dict = None) -> dict:
+        params = dict(params or {})
+        if "access_token=" not in url:
+            params["access_token"] = self.token
+        # An empty params dict would make httpx drop the query of a "next" link
+        async with self._semaphore:
+            res = await http_transport.async_request(self.client, "GET", url, params=params or None)
+        if res.status_code != 200:
+            raise GraphAPIError(f"Graph API {res.status_code}: {res.text[:200]}")
+        return res.json()
+
+    async def batch(self, relative_urls: list) -> list:
+        """
+        Run GET ``relative_urls`` through the Graph batch endpoint and
+        return each decoded body ({} for failed sub-requests).
+        """
+        requests_ = [{"method": "GET", "relative_url": url} for url in relative_urls]
+        async with self._semaphore:
+            res = await http_transport.async_request(
+                self.client, "POST", f"{GRAPH_URL}/",
+                data={"access_token": self.token, "batch": json.dumps(requests_)},
+            )
+        if res.status_code != 200:
+            raise GraphAPIError(f"Graph batch {res.status_code}: {res.text[:200]}")
+
+        bodies = []
+        for sub in res.json():
+            if not sub or sub.get("code") != 200:
+                bodies.append({})
+                continue
+            try:
+                bodies.append(json.loads(sub.get("body") or "{}"))
+            except ValueError:
+                bodies.append({})
+        return bodies
+
+    async def iter_post_pages(self, max_posts: int, max_comments: int = 0,
+                              strict: bool = False, since: int = None):
+        """
+        Yield pages (lists) of raw posts until ``max_posts`` are seen.
+        ``since`` (unix time) restricts the feed to newer posts.
+        """
+        fields = POST_FIELDS
+        if max_comments:
+            fields += f",comments.limit({max_comments}){{{COMMENT_FIELDS}}}"
+
+        url = f"{GRAPH_URL}/me/posts"
+        params = {"fields": fields, "limit": max(1, min(max_posts, POSTS_PAGE_SIZE))}
+        if since:
+            params["since"] = since
+        fetched = 0
+
+        while url and fetched < max_posts:
+            try:
+                data = await self.get(url, params)
+            except (GraphAPIError, httpx.HTTPError) as e:
+                if strict:
+                    raise GraphAPIError(f"Facebook API failed: {e}") from e
+                logger.error(f"Posts page failed: {e}")
+                return
+
+            posts = data.get("data", [])[: max_posts - fetched]
+            fetched += len(posts)
+            if posts:
+                yield posts
+
+            # The "next" link already carries every query parameter.
+            url = data.get("paging", {}).get("next")
+            params = None
+
+    async def resolve_shared(self, object_ids: list) -> dict:
+        """Fetch the message of each shared object, BATCH_SIZE per call."""
+        missing = [oid for oid in dict.fromkeys(object_ids) if oid not in self._shared_cache]
+        chunks = [missing[i:i + BATCH_SIZE] for i in range(0, len(missing), BATCH_SIZE)]
+
+        async def run(chunk):
+            try:
+                bodies = await self.batch([f"{oid}?fields=message" for oid in chunk])
+            except (GraphAPIError, httpx.HTTPError) as e:
+                logger.warning(f"Shared story batch failed: {e}")
+                bodies = [{} for _ in chunk]
+            for oid, body in zip(chunk, bodies):
+                self._shared_cache[oid] = body.get("message", "")
+
+        await asyncio.gather(*(run(chunk) for chunk in chunks))
+        return {oid: self._shared_cache.get(oid, "") for oid in object_ids}
+
+    async def resolve_page(self, posts: list, max_comments: int, resolve_shared: bool) -> list:
+        shared = {}
+        if resolve_shared:
+            shared = await self.resolve_shared([
+                p["object_id"] for p in posts
+                if p.get("status_type") == "shared_story" and p.get("object_id")
+            ])
+
+        items = []
+        for post in posts:
+            content = post.get("message") or post.get("story") or ""
+            comments = post.pop("comments", {}).get("data", []) if max_comments else []
+            items.append({
+                "post": post,
+                "content": shared.get(post.get("object_id")) or content,
+                "comments": comments[:max_comments],
+            })
+        return items
+
+    async def iter_posts(self, max_posts: int, max_comments: int = 0,
+                         resolve_shared: bool = True, strict: bool = False,
+                         since: int = None):
+        """
+        Yield enriched posts in feed order. Each page is resolved as soon
+        as it arrives, overlapping with the fetch of the next page.
+        """
+        pages = asyncio.Queue()
+
+        async def produce():
+            try:
+                async for page in self.iter_post_pages(max_posts, max_comments, strict=strict, since=since):
+                    await pages.put(asyncio.ensure_future(
+                        self.resolve_page(page, max_comments, resolve_shared)
+                    ))
+            finally:
+                await pages.put(None)
+
+        producer = asyncio.ensure_future(produce())
+        try:
+            while True:
+                task = await pages.get()
+                if task is None:
+                    break
+                for item in await task:
+                    yield item
+            await producer
+        finally:
+            producer.cancel()
+
+
+async def fetch_posts(token: str, max_posts: int, max_comments: int = 0,
+                      resolve_shared: bool = True, strict: bool = False,
+                      concurrency: int = GRAPH_CONCURRENCY) -> list:
+    async with http_transport.async_client() as client:
+        fetcher = GraphFetcher(token, client, concurrency=concurrency)
+        return [
+            item async for item in fetcher.iter_posts(
+                max_posts, max_comments, resolve_shared=resolve_shared, strict=strict
+            )
+        ]
+
+
+def fetch_posts_sync(token: str, max_posts: int, **kwargs) -> list:
+    """Blocking entry point for sync Django views and Celery tasks."""
+    return asyncio.run(fetch_posts(token, max_posts, **kwargs))
+
+
+def iter_posts_sync(token: str, max_posts: int, max_comments: int = 0,
+                    resolve_shared: bool = True, strict: bool = False,
+                    since: int = None, concurrency: int = GRAPH_CONCURRENCY):
+    """
+    Blocking generator over enriched posts for streaming responses.
+    Drives the async fetcher on a private event loop so each post is
+    handed over as soon as its page is resolved.
+    """
+    loop = asyncio.new_event_loop()
+
+    async def open_posts():
+        client = http_transport.async_client()
+        fetcher = GraphFetcher(token, client, concurrency=concurrency)
+        agen = fetcher.iter_posts(
+            max_posts, max_comments, resolve_shared=resolve_shared, strict=strict, since=since
+        )
+        return client, agen
+
+    try:
+        client, agen = loop.run_until_complete(open_posts())
+        try:
+            while True:
+                try:
+                    yield loop.run_until_complete(agen.__anext__())
+                except StopAsyncIteration:
+                    break
+        finally:
+            loop.run_until_complete(agen.aclose())
+            loop.run_until_complete(client.aclose())
+    finally:
+        loop.close()
@@ -0,0 +1,360 @@
+# backend/insights/hf_models.py
+
+import inspect
+import logging
+import os
+import threading
+
+from insights.label_maps import SENTIMENT_MAP, TOXICITY_MAP, MISINFO_MAP
+from insights.inference import empty_result, error_result
+from insights.pii import find_values
+
+# Prevent heavy torchvision import
+os.environ["TRANSFORMERS_NO_TORCHVISION_IMPORT"] = "1"
+
+logger = logging.getLogger(__name__)
+
+SENTIMENT_MODEL = os.getenv("SENTIMENT_MODEL", "Anjanie/roberta-sentiment")
+TOXIC_MODEL = os.getenv("TOXIC_MODEL", "Anjanie/distilbert-base-uncased-toxicity")
+MISINFO_MODEL = os.getenv("MISINFO_MODEL", "Anjanie/bert-base-uncased-misinformation")
+NER_MODEL = os.getenv("NER_MODEL", "dslim/bert-base-NER")
+# Reads Sinhala, Tamil and other languages directly, no translation needed
+MULTILINGUAL_SENTIMENT_MODEL = os.getenv(
+    "MULTILINGUAL_SENTIMENT_MODEL", "cardiffnlp/twitter-xlm-roberta-base-sentiment"
+)
+MAX_LENGTH = 256
+BATCH_SIZE = int(os.getenv("LOCAL_BATCH_SIZE", "32"))
+
+_pipelines = {}
+_failed = set()
+_lock = threading.Lock()
+
+
+# -----------------------------
+# Shared Pipelines
+# -----------------------------
+def _load_classifier(model_id: str):
+    from insights.optimized_models import LOCAL_MODEL_RUNTIME, load_classifier
+
+    try:
+        return load_classifier(model_id, LOCAL_MODEL_RUNTIME, MAX_LENGTH)
+    except Exception as e:
+        if LOCAL_MODEL_RUNTIME == "fp32":
+            raise
+        logger.warning(f"{LOCAL_MODEL_RUNTIME} model unavailable for {model_id}, using fp32: {e}")
+        return load_classifier(model_id, "fp32", MAX_LENGTH)
+
+
+def _get_pipeline(task: str, model_id: str, **kwargs):
+    """
+    Load a transformers pipeline once per process and share it between
+    threads. Classifiers honour LOCAL_MODEL_RUNTIME (fp32, int8, onnx).
+    Returns None if the model cannot be loaded.
+    """
+    key = (task, model_id)
+    if key in _pipelines:
+        return _pipelines[key]
+    if key in _failed:
+        return None
+
+    with _lock:
+        if key in _pipelines:
+            return _pipelines[key]
+        try:
+            if task == "text-classification":
+                _pipelines[key] = _load_classifier(model_id)
+            else:
+                from transformers import pipeline
+
+                _pipelines[key] = pipeline(task, model=model_id, device=-1, **kwargs)
+            logger.info(f"Local model loaded: {model_id}")
+        except Exception as e:
+            logger.error(f"Local model load failed for {model_id}: {e}")
+            _failed.add(key)
+            return None
+    return _pipelines[key]
+
+
+def get_sentiment_model():
+    return _get_pipeline("text-classification", SENTIMENT_MODEL)
+
+
+def get_multilingual_sentiment_model():
+    return _get_pipeline("text-classification", MULTILINGUAL_SENTIMENT_MODEL)
+
+
+def get_toxic_model():
+    return _get_pipeline("text-classification", TOXIC_MODEL)
+
+
+def get_misinfo_model():
+    return _get_pipeline("text-classification", MISINFO_MODEL)
+
+
+def get_ner_model():
+    return _get_pipeline("ner", NER_MODEL, aggregation_strategy="simple")
+
+
+def multilingual_sentiment_labels(texts: list):
+    """
+    Sentiment labels for non-English ``texts`` from the multilingual
+    model in one batched call, or None when it is unavailable.
+    """
+    predictor = get_multilingual_sentiment_model()
+    if not predictor or not texts:
+        return None
+    try:
+        preds = predictor(list(texts), batch_size=BATCH_SIZE)
+        return [map_sentiment_label(pred.get("label", "")) for pred in preds]
+    except Exception as e:
+        logger.error(f"[MULTILINGUAL SENTIMENT ERROR] {e}")
+        return None
+
+
+def map_sentiment_label(label: str) -> str:
+    return SENTIMENT_MAP.get(label, SENTIMENT_MAP.get(str(label).lower(), "neutral"))
+
+
+def map_flag_label(label: str, label_map: dict) -> bool:
+    label = str(label)
+    if label in label_map:
+        return label_map[label]
+    return label.upper() in label_map and label_map[label.upper()]
+
+
+# -----------------------------
+# Entity Extraction Helper
+# -----------------------------
+def extract_entities(text: str):
+    locations = []
+    ner = get_ner_model()
+    if ner and text and text.strip():
+        try:
+            for e in ner(text):
+                label = e.get("entity_group", "") or e.get("entity", "")
+                if any(tag in label.upper() for tag in ["LOC", "GPE"]):
+                    locations.append(e.get("word", "").replace("##", ""))
+        except Exception as e:
+            logger.error(f"NER extraction failed: {e}")
+
+    return _entities(text, locations)
+
+
+def _entities(text: str, locations: list) -> dict:
+    return {
+        "locations": list(dict.fromkeys(locations)),
+        "emails": find_values(text or "", "email"),
+        "phones": find_values(text or "", "phone"),
+    }
+
+
+def extract_entities_many(texts: list) -> list:
+    """Batched ``extract_entities``: one NER pipeline call for all texts."""
+    ner = get_ner_model()
+    found = [[] for _ in texts]
+    if ner and texts:
+        try:
+            for locations, ents in zip(found, ner(list(texts), batch_size=BATCH_SIZE)):
+                for e in ents:
+                    label = e.get("entity_group", "") or e.get("entity", "")
+                    if any(tag in label.upper() for tag in ["LOC", "GPE"]):
+                        locations.append(e.get("word", "").replace("##", ""))
+        except Exception as e:
+            logger.error(f"NER extraction failed: {e}")
+    return [_entities(text, locations) for text, locations in zip(texts, found)]
+
+
+# -----------------------------
+# Local Analysis (same schema as gradio_models.analyze_text_gradio)
+# -----------------------------
+def _top_label(predictor, text: str):
+    if not predictor:
+        return None
+    pred = predictor(text)
+    if pred and isinstance(pred, list):
+        data = pred[0][0] if isinstance(pred[0], list) else pred[0]
+        return data.get("label")
+    return None
+
+
+def analyze_text_local(text: str) -> dict:
+    from insights.gradio_models import emoji_sentiment
+
+    result = empty_result()
+    if not text or not text.strip():
+        return result
+
+    try:
+        sentiment_raw = _top_label(get_sentiment_model(), text)
+        toxic_raw = _top_label(get_toxic_model(), text)
+        if not sentiment_raw or not toxic_raw:
+            logger.error("[LOCAL MODEL ERROR] Sentiment or toxicity model unavailable")
+            return _unscored()
+
+        result["label"] = emoji_sentiment(text) or map_sentiment_label(sentiment_raw)
+        result["toxic"] = (
+            map_flag_label(toxic_raw, TOXICITY_MAP) or str(toxic_raw).lower() == "toxic"
+        )
+
+        misinfo_raw = _top_label(get_misinfo_model(), text)
+        result["misinformation"] = bool(misinfo_raw) and map_flag_label(misinfo_raw, MISINFO_MAP)
+
+        entities = extract_entities(text)
+        result["entities"] = [{"entity": "LOCATION", "word": w} for w in entities["locations"]]
+        result["phones"] = entities["phones"]
+        result["emails"] = entities["emails"]
+    except Exception as e:
+        logger.error(f"[LOCAL MODEL ERROR] {e}")
+        return error_result("failed")
+
+    return result
+
+
+def _unscored() -> dict:
+    # The label and toxicity feed the metrics; without their models they
+    # would only be defaults, so the text is reported as not analyzed
+    return error_result("unavailable")
+
+
+# -----------------------------
+# Batched Local Classification
+# -----------------------------
+BUCKET_WIDTH = 16  # tokens
+
+
+def _classifiers() -> dict:
+    """Loaded text-classification pipelines keyed by output field."""
+    return {
+        name: predictor for name, predictor in (
+            ("sentiment", get_sentiment_model()),
+            ("toxic", get_toxic_model()),
+            ("misinformation", get_misinfo_model()),
+        ) if predictor
+    }
+
+
+_signatures = {}
+
+
+def _tokenizer_signature(tokenizer) -> tuple:
+    """
+    Tokenizers with the same class, casing and vocabulary produce the
+    same ids, so texts only need tokenizing once for all of them.
+    """
+    key = id(tokenizer)
+    if key not in _signatures:
+        vocab = sorted(tokenizer.get_vocab().items())
+        _signatures[key] = (
+            type(tokenizer).__name__,
+            getattr(tokenizer, "do_lower_case", None),
+            hash(tuple(vocab)),
+        )
+    return _signatures[key]
+
+
+def _model_inputs(model, features) -> dict:
+    """Drop inputs a model does not take (e.g. token_type_ids for DistilBERT)."""
+    accepted = getattr(model, "input_names", None) or inspect.signature(model.forward).parameters
+    return {key: value for key, value in features.items() if key in accepted}
+
+
+def length_buckets(lengths: list, bucket_width: int = BUCKET_WIDTH, batch_size: int = BATCH_SIZE) -> list:
+    """
+    Group indices by token length so each batch pads to a similar
+    length. Returns lists of original indices.
+    """
+    order = sorted(range(len(lengths)), key=lambda i: lengths[i])
+    batches, current, current_bucket = [], [], None
+    for i in order:
+        bucket = lengths[i] // bucket_width
+        if current and (bucket != current_bucket or len(current) >= batch_size):
+            batches.append(current)
+            current = []
+        current.append(i)
+        current_bucket = bucket
+    if current:
+        batches.append(current)
+    return batches
+
+
+def classify_batch(texts: list) -> dict:
+    """
+    Run every loaded classifier over ``texts`` and return
+    {field: [label, ...]} in the original order.
+
+    Texts are tokenized once per distinct tokenizer, sorted into
+    token-length buckets, and each bucket goes through each model in a
+    single forward pass.
+    """
+    import torch
+
+    classifiers = _classifiers()
+    labels = {name: [None] * len(texts) for name in classifiers}
+    if not texts or not classifiers:
+        return labels
+
+    groups = {}
+    for name, predictor in classifiers.items():
+        groups.setdefault(_tokenizer_signature(predictor.tokenizer), []).append(name)
+
+    for names in groups.values():
+        tokenizer = classifiers[names[0]].tokenizer
+        encoded = tokenizer(texts, truncation=True, max_length=MAX_LENGTH)
+        lengths = [len(ids) for ids in encoded["input_ids"]]
+
+        for batch in length_buckets(lengths):
+            features = tokenizer.pad(
+                {key: [encoded[key][i] for i in batch] for key in encoded.keys()},
+                return_tensors="pt",
+            )
+            with torch.inference_mode():
+                for name in names:
+                    model = classifiers[name].model
+                    logits = model(**_model_inputs(model, features)).logits
+                    for i, pred in zip(batch, logits.argmax(dim=-1).tolist()):
+                        labels[name][i] = model.config.id2label[pred]
+    return labels
+
+
+def analyze_texts_local(texts: list) -> list:
+    """Batched ``analyze_text_local``; results come back in input order."""
+    from insights.gradio_models import emoji_sentiment
+
+    results = [empty_result() for _ in texts]
+    pending = [i for i, text in enumerate(texts) if text and text.strip()]
+    if not pending:
+        return results
+
+    try:
+        labels = classify_batch([texts[i] for i in pending])
+    except Exception as e:
+        logger.error(f"[LOCAL BATCH ERROR] {e}")
+        return [analyze_text_local(text) for text in texts]
+
+    entities_list = extract_entities_many([texts[i] for i in pending])
+    unscored = 0
+
+    for pos, i in enumerate(pending):
+        text, result = texts[i], results[i]
+        sentiment_raw = labels.get("sentiment", [None] * len(pending))[pos]
+        toxic_raw = labels.get("toxic", [None] * len(pending))[pos]
+        misinfo_raw = labels.get("misinformation", [None] * len(pending))[pos]
+        if not sentiment_raw or not toxic_raw:
+            results[i] = _unscored()
+            unscored += 1
+            continue
+
+        result["label"] = emoji_sentiment(text) or map_sentiment_label(sentiment_raw)
+        result["toxic"] = (
+            map_flag_label(toxic_raw, TOXICITY_MAP) or str(toxic_raw).lower() == "toxic"
+        )
+        result["misinformation"] = bool(misinfo_raw) and map_flag_label(misinfo_raw, MISINFO_MAP)
+
+        entities = entities_list[pos]
+        result["entities"] = [{"entity": "LOCATION", "word": w} for w in entities["locations"]]
+        result["phones"] = entities["phones"]
+        result["emails"] = entities["emails"]
+
+    if unscored:
+        logger.error(f"[LOCAL MODEL ERROR] Sentiment or toxicity model unavailable for {unscored} texts")
+    return results
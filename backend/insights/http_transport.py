@@ -0,0 +1,130 @@
+# backend/insights/http_transport.py
+
+import os
+import time
+import random
+import asyncio
+import logging
+import threading
+from urllib.parse import urlsplit
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "5"))
+READ_TIMEOUT = float(os.getenv("HTTP_READ_TIMEOUT", "20"))
+DEFAULT_TIMEOUT = (CONNECT_TIMEOUT, READ_TIMEOUT)
+MAX_RETRIES = int(os.getenv("HTTP_MAX_RETRIES", "3"))
+BACKOFF_BASE = float(os.getenv("HTTP_BACKOFF_BASE", "0.5"))
+BACKOFF_MAX = float(os.getenv("HTTP_BACKOFF_MAX", "8"))
+POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", "10"))
+HTTP2_ENABLED = os.getenv("HTTP2_ENABLED", "false").lower() == "true"
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+_sessions = {}
+_sessions_lock = threading.Lock()
+
+
+# Backoff
+
+def backoff_delay(attempt: int, retry_after=None) -> float:
+    """Full-jitter exponential backoff, honouring Retry-After when given."""
+    if retry_after:
+        try:
+            return min(float(retry_after), BACKOFF_MAX)
+        except ValueError:
+            pass
+    return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * (2 ** attempt)))
+
+
+# Sync Transport (requests)
+
+def get_session(url: str) -> requests.Session:
+    """
+    Pooled keep-alive session for the host of ``url``. Sessions are kept
+    per process so forked workers never share sockets.
+    """
+    key = (os.getpid(), urlsplit(url).netloc)
+    session = _sessions.get(key)
+    if session is None:
+        with _sessions_lock:
+            session = _sessions.get(key)
+            if session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=POOL_SIZE)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                _sessions[key] = session
+    return session
+
+
+def request(method: str, url: str, timeout=DEFAULT_TIMEOUT, retries: int = MAX_RETRIES, **kwargs) -> requests.Response:
+    """
+    Send a request through the pooled session, retrying 429/5xx responses
+    and connection errors with jittered exponential backoff. The last
+    response is returned once retries run out; the last connection error
+    is raised.
+    """
+    session = get_session(url)
+    for attempt in range(retries + 1):
+        try:
+            res = session.request(method, url, timeout=timeout, **kwargs)
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+            if attempt >= retries:
+                raise
+            delay = backoff_delay(attempt)
+            logger.warning(f"[HTTP RETRY] {method} {urlsplit(url).netloc} failed ({e}), retrying in {delay:.2f}s")
+            time.sleep(delay)
+            continue
+
+        if res.status_code not in RETRY_STATUSES or attempt >= retries:
+            return res
+        delay = backoff_delay(attempt, res.headers.get("Retry-After"))
+        logger.warning(f"[HTTP RETRY] {method} {urlsplit(url).netloc} -> {res.status_code}, retrying in {delay:.2f}s")
+        time.sleep(delay)
+
+
+def get(url: str, **kwargs) -> requests.Response:
+    return request("GET", url, **kwargs)
+
+
+def post(url: str, **kwargs) -> requests.Response:
+    return request("POST", url, **kwargs)
+
+
+# Async Transport (httpx)
+
+def async_client(**kwargs) -> httpx.AsyncClient:
+    """
+    Keep-alive httpx client with default timeouts and optional HTTP/2.
+    httpx clients are bound to an event loop, so create one per run.
+    """
+    kwargs.setdefault("timeout", httpx.Timeout(READ_TIMEOUT, connect=CONNECT_TIMEOUT))
+    kwargs.setdefault("limits", httpx.Limits(max_connections=POOL_SIZE, max_keepalive_connections=POOL_SIZE))
+    kwargs.setdefault("http2", HTTP2_ENABLED)
+    return httpx.AsyncClient(**kwargs)
+
+
+async def async_request(client: httpx.AsyncClient, method: str, url: str,
+                        retries: int = MAX_RETRIES, **kwargs) -> httpx.Response:
+    """Async counterpart of ``request`` with the same retry policy."""
+    for attempt in range(retries + 1):
+        try:
+            res = await client.request(method, url, **kwargs)
+        except httpx.TransportError as e:
+            if attempt >= retries:
+                raise
+            delay = backoff_delay(attempt)
+            logger.warning(f"[HTTP RETRY] {method} {urlsplit(url).netloc} failed ({e}), retrying in {delay:.2f}s")
+            await asyncio.sleep(delay)
+            continue
+
+        if res.status_code not in RETRY_STATUSES or attempt >= retries:
+            return res
+        delay = backoff_delay(attempt, res.headers.get("Retry-After"))
+        logger.warning(f"[HTTP RETRY] {method} {urlsplit(url).netloc} -> {res.status_code}, retrying in {delay:.2f}s")
+        await asyncio.sleep(delay)
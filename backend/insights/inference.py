@@ -0,0 +1,66 @@
+# backend/insights/inference.py
+
+import os
+import logging
+from importlib import import_module
+
+logger = logging.getLogger(__name__)
+
+# "ml" (the default analysis method) resolves to this backend.
+INFERENCE_BACKEND = os.getenv("INFERENCE_BACKEND", "gradio")
+
+# name -> (module, single-text function, batch function). Every backend
+# returns the analyze_text_gradio result schema.
+BACKENDS = {
+    "gradio": ("insights.gradio_models", "analyze_text_gradio", "analyze_texts_gradio"),
+    "local": ("insights.hf_models", "analyze_text_local", "analyze_texts_local"),
+    # Local models hosted once per machine by insights.inference_server
+    "sidecar": ("insights.sidecar_models", "analyze_text_sidecar", "analyze_texts_sidecar"),
+    # Rules and a hashed n-gram model first, CASCADE_FALLBACK when unsure
+    "cascade": ("insights.cascade", "analyze_text_cascade", "analyze_texts_cascade"),
+}
+
+
+def empty_result() -> dict:
+    """The neutral result every backend returns for empty text."""
+    return {
+        "label": "neutral",
+        "toxic": False,
+        "misinformation": False,
+        "entities": [], "phones": [], "emails": []
+    }
+
+
+def error_result(error: str) -> dict:
+    """
+    Returned for a text the backend could not analyze. It has no label,
+    so it is not mistaken for a neutral post, and metrics skip it.
+    """
+    return {**empty_result(), "label": None, "error": error}
+
+
+class InferenceUnavailable(Exception):
+    """The backend cannot take more work right now."""
+
+
+def backend_name(method: str = "ml") -> str:
+    if method in BACKENDS:
+        return method
+    if INFERENCE_BACKEND not in BACKENDS:
+        logger.warning(f"Unknown INFERENCE_BACKEND={INFERENCE_BACKEND}, using gradio")
+        return "gradio"
+    return INFERENCE_BACKEND
+
+
+def _resolve(method: str, batch: bool):
+    # Import lazily so the remote backend never pulls in transformers.
+    module, single, many = BACKENDS[backend_name(method)]
+    return getattr(import_module(module), many if batch else single)
+
+
+def run_inference(text: str, method: str = "ml") -> dict:
+    return _resolve(method, batch=False)(text)
+
+
+def run_inference_many(texts: list, method: str = "ml") -> list:
+    return _resolve(method, batch=True)(texts)
@@ -0,0 +1,142 @@
+# backend/insights/inference_server.py
+#
+# Shared local inference server. Run one per host:
+#
+#   python manage.py run_inference_server            # UNIX socket
+#   python manage.py run_inference_server --port 8765
+#
+# Web workers and Celery children then use INFERENCE_BACKEND=sidecar
+# instead of each loading the models themselves.
+
+import os
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import List
+
+from fastapi import FastAPI, HTTPException
+from pydantic import BaseModel
+
+from insights import hf_models
+
+logger = logging.getLogger(__name__)
+
+SERVER_MAX_BATCH = int(os.getenv("SIDECAR_MAX_BATCH", "64"))
+SERVER_WAIT_MS = float(os.getenv("SIDECAR_WAIT_MS", "15"))
+MAX_TEXTS_PER_REQUEST = int(os.getenv("SIDECAR_MAX_TEXTS", "512"))
+
+
+class DynamicBatcher:
+    """
+    Single queue in front of the models. Texts from concurrent requests
+    are collected for up to ``wait_ms`` or ``max_size`` texts and run as
+    one ``analyze_texts_local`` call on a dedicated model thread.
+    """
+
+    def __init__(self, max_size=SERVER_MAX_BATCH, wait_ms=SERVER_WAIT_MS):
+        self.max_size = max(1, max_size)
+        self.wait = max(0.0, wait_ms) / 1000.0
+        self.queue = None
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="inference")
+        self.batches = 0
+        self.texts = 0
+
+    async def submit(self, texts: list) -> list:
+        loop = asyncio.get_running_loop()
+        futures = []
+        for text in texts:
+            future = loop.create_future()
+            self.queue.put_nowait((text, future))
+            futures.append(future)
+        return await asyncio.gather(*futures)
+
+    async def _collect(self) -> list:
+        loop = asyncio.get_running_loop()
+        batch = [await self.queue.get()]
+        deadline = loop.time() + self.wait
+        while len(batch) < self.max_size:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self.queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._collect()
+            unique = list(dict.fromkeys(text for text, _ in batch))
+            try:
+                results = await loop.run_in_executor(
+                    self.executor, hf_models.analyze_texts_local, unique
+                )
+            except Exception as e:
+                logger.error(f"[SIDECAR BATCH ERROR] {e}")
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            by_text = dict(zip(unique, results))
+            for text, future in batch:
+                if not future.done():
+                    future.set_result(by_text[text])
+            self.batches += 1
+            self.texts += len(unique)
+
+    def stats(self) -> dict:
+        return {
+            "queued": self.queue.qsize() if self.queue else 0,
+            "batches": self.batches,
+            "texts": self.texts,
+            "avg_batch_size": round(self.texts / self.batches, 2) if self.batches else 0.0,
+        }
+
+
+def load_models() -> list:
+    """Load every local model up front so the first request is not slow."""
+    loaded = list(hf_models._classifiers())
+    if hf_models.get_ner_model():
+        loaded.append("ner")
+    return loaded
+
+
+batcher = DynamicBatcher()
+_loaded_models = []
+
+
+@asynccontextmanager
+async def lifespan(app):
+    loop = asyncio.get_running_loop()
+    _loaded_models[:] = await loop.run_in_executor(batcher.executor, load_models)
+    logger.info(f"Inference server ready, models: {_loaded_models}")
+
+    batcher.queue = asyncio.Queue()
+    task = asyncio.create_task(batcher.run())
+    try:
+        yield
+    finally:
+        task.cancel()
+
+
+app = FastAPI(title="Insights inference", lifespan=lifespan)
+
+
+class AnalyzeRequest(BaseModel):
+    texts: List[str]
+
+
+@app.post("/analyze")
+async def analyze(request: AnalyzeRequest):
+    if len(request.texts) > MAX_TEXTS_PER_REQUEST:
+        raise HTTPException(status_code=413, detail=f"At most {MAX_TEXTS_PER_REQUEST} texts per request")
+    return {"results": await batcher.submit(request.texts)}
+
+
+@app.get("/health")
+async def health():
+    return {"status": "ok", "models": _loaded_models, **batcher.stats()}
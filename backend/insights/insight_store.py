@@ -0,0 +1,120 @@
+# backend/insights/insight_store.py
+
+import logging
+from datetime import datetime
+
+from dateutil import parser
+from pymongo import ASCENDING, DESCENDING, UpdateOne
+
+from .mongo_client import db
+
+logger = logging.getLogger(__name__)
+
+post_insights_collection = db["post_insights"]
+_indexes_ready = False
+
+
+def ensure_indexes():
+    """
+    Analyses are keyed by ``(post_id, method)``: the same post analyzed
+    with another method is a separate entry. The single-field indexes
+    from before the method was part of the key are dropped.
+    """
+    global _indexes_ready
+    if _indexes_ready:
+        return
+    existing = post_insights_collection.index_information()
+    for name in ("post_id_1", "profile_id_1_created_time_-1"):
+        if name in existing:
+            post_insights_collection.drop_index(name)
+    post_insights_collection.create_index([("post_id", ASCENDING), ("method", ASCENDING)], unique=True)
+    post_insights_collection.create_index(
+        [("profile_id", ASCENDING), ("method", ASCENDING), ("created_time", DESCENDING)]
+    )
+    _indexes_ready = True
+
+
+def save_post_insights(profile_id: str, method: str, insights: list) -> int:
+    """
+    Bulk-upsert per-post analyses keyed by post id and method. A stored
+    analysis is only replaced when the post's ``updated_time`` has
+    changed. Failed analyses are not stored, so a later fetch retries
+    them.
+    """
+    ensure_indexes()
+    ops = []
+    for insight in insights:
+        post_id = insight.get("post_id")
+        if not post_id or insight.get("error"):
+            continue
+        updated_time = insight.get("updated_time") or insight.get("timestamp")
+        ops.append(UpdateOne(
+            {"post_id": post_id, "method": method},
+            [{"$set": {
+                "profile_id": profile_id,
+                "created_time": insight.get("timestamp"),
+                "updated_time": updated_time,
+                "insight": {"$cond": [
+                    {"$eq": ["$updated_time", updated_time]},
+                    "$insight",
+                    {"$literal": insight},
+                ]},
+                "stored_at": datetime.utcnow(),
+            }}],
+            upsert=True,
+        ))
+
+    if not ops:
+        return 0
+    result = post_insights_collection.bulk_write(ops, ordered=False)
+    return result.upserted_count + result.modified_count
+
+
+def load_post_insights(profile_id: str, method: str, limit: int) -> list:
+    """Newest-first stored analyses for a profile."""
+    cursor = (
+        post_insights_collection
+        .find({"profile_id": profile_id, "method": method}, {"_id": 0, "insight": 1})
+        .sort("created_time", DESCENDING)
+        .limit(limit)
+    )
+    return [doc["insight"] for doc in cursor]
+
+
+def count_post_insights(profile_id: str, method: str) -> int:
+    return post_insights_collection.count_documents({"profile_id": profile_id, "method": method})
+
+
+def prune_post_insights(profile_id: str, method: str, insights: list) -> int:
+    """
+    Delete stored posts that a full fetch no longer returns. Only the
+    window the fetch covered (back to its oldest post) is checked;
+    older stored posts were simply out of range.
+    """
+    times = [i["timestamp"] for i in insights if i.get("timestamp")]
+    if not times:
+        return 0
+    oldest = min(times, key=lambda t: since_timestamp(t) or 0)
+    result = post_insights_collection.delete_many({
+        "profile_id": profile_id,
+        "method": method,
+        "created_time": {"$gte": oldest},
+        "post_id": {"$nin": [i["post_id"] for i in insights if i.get("post_id")]},
+    })
+    return result.deleted_count
+
+
+def since_timestamp(created_time):
+    """Convert a Graph ``created_time`` into the unix time ``since`` expects."""
+    if not created_time:
+        return None
+    try:
+        return int(parser.parse(created_time).timestamp())
+    except (ValueError, OverflowError) as e:
+        logger.warning(f"Invalid since cursor {created_time}: {e}")
+        return None
+
+
+def newest_post_time(insights: list):
+    times = [i.get("timestamp") for i in insights if i.get("timestamp")]
+    return max(times, key=lambda t: since_timestamp(t) or 0) if times else None
@@ -0,0 +1,192 @@
+# backend/insights/lexicon.py
+
+import os
+import time
+import logging
+import threading
+from collections import deque
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+LEXICON_DIR = Path(__file__).resolve().parent / "lexicons"
+TOXIC_LEXICON_PATH = Path(os.getenv("TOXIC_LEXICON_PATH", LEXICON_DIR / "toxic_terms.txt"))
+GAZETTEER_PATH = Path(os.getenv("GAZETTEER_PATH", LEXICON_DIR / "places.txt"))
+# How often a lexicon file is checked for changes
+LEXICON_CHECK_SECONDS = float(os.getenv("LEXICON_CHECK_SECONDS", "30"))
+
+
+def _fold(text: str) -> str:
+    """Lowercase without changing length, so match offsets stay valid."""
+    folded = text.lower()
+    if len(folded) == len(text):
+        return folded
+    return "".join(c if len(c.lower()) != 1 else c.lower() for c in text)
+
+
+def _is_word_char(ch: str) -> bool:
+    return ch.isalnum() or ch == "_"
+
+
+class AhoCorasick:
+    """
+    Multi-pattern matcher. All terms are found in one pass over the
+    text, so the cost per text depends on its length and the number of
+    matches, not on how many terms are loaded. Matching is
+    case-insensitive and only whole words count: "ass" does not match
+    inside "class".
+    """
+
+    def __init__(self, terms: dict):
+        # terms: pattern -> value returned on a match
+        self.values = []
+        self.lengths = []
+        self.goto = [{}]
+        self.fail = [0]
+        self.output = [[]]
+
+        for pattern, value in terms.items():
+            pattern = _fold(pattern.strip())
+            if not pattern:
+                continue
+            node = 0
+            for ch in pattern:
+                nxt = self.goto[node].get(ch)
+                if nxt is None:
+                    nxt = len(self.goto)
+                    self.goto[node][ch] = nxt
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.output.append([])
+                node = nxt
+            if not self.output[node]:
+                self.output[node].append(len(self.values))
+                self.values.append(value)
+                self.lengths.append(len(pattern))
+
+        # Breadth-first failure links; outputs are merged along them
+        queue = deque(self.goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, nxt in self.goto[node].items():
+                queue.append(nxt)
+                f = self.fail[node]
+                while f and ch not in self.goto[f]:
+                    f = self.fail[f]
+                self.fail[nxt] = self.goto[f].get(ch, 0)
+                self.output[nxt] = self.output[nxt] + self.output[self.fail[nxt]]
+
+    def __len__(self):
+        return len(self.values)
+
+    def iter_matches(self, text: str):
+        """Yield ``(start, end, value)`` for every whole-word match, overlaps included."""
+        if not text or not self.values:
+            return
+        folded = _fold(text)
+        goto, fail, output = self.goto, self.fail, self.output
+        node = 0
+        for i, ch in enumerate(folded):
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            for pid in output[node]:
+                start = i - self.lengths[pid] + 1
+                end = i + 1
+                if start > 0 and _is_word_char(folded[start - 1]) and _is_word_char(folded[start]):
+                    continue
+                if end < len(folded) and _is_word_char(folded[end]) and _is_word_char(folded[end - 1]):
+                    continue
+                yield start, end, self.values[pid]
+
+    def find_all(self, text: str) -> list:
+        """Leftmost-longest, non-overlapping matches as ``(start, end, value)``."""
+        matches = sorted(self.iter_matches(text), key=lambda m: (m[0], -(m[1] - m[0])))
+        selected, last_end = [], 0
+        for start, end, value in matches:
+            if start >= last_end:
+                selected.append((start, end, value))
+                last_end = end
+        return selected
+
+    def first(self, text: str):
+        matches = self.find_all(text)
+        return matches[0][2] if matches else None
+
+    def contains(self, text: str) -> bool:
+        return next(self.iter_matches(text), None) is not None
+
+
+def read_lexicon(path: Path) -> dict:
+    """
+    One term per line; ``#`` starts a comment. ``term => value`` maps an
+    alias onto a canonical value (e.g. ``cmb => Colombo``); otherwise the
+    term itself is the value.
+    """
+    terms = {}
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.split("#", 1)[0].strip()
+            if not line:
+                continue
+            term, _, value = line.partition("=>")
+            terms[term.strip()] = value.strip() or term.strip()
+    return terms
+
+
+class Lexicon:
+    """
+    A matcher built from a lexicon file and rebuilt when the file
+    changes. The check runs at most every LEXICON_CHECK_SECONDS; readers
+    keep using the old matcher until the new one is swapped in.
+    """
+
+    def __init__(self, path: Path, check_seconds: float = LEXICON_CHECK_SECONDS):
+        self.path = Path(path)
+        self.check_seconds = check_seconds
+        self._matcher = None
+        self._mtime = None
+        self._checked = 0.0
+        self._lock = threading.Lock()
+
+    def _load(self):
+        try:
+            mtime = self.path.stat().st_mtime
+            if mtime == self._mtime and self._matcher is not None:
+                return
+            matcher = AhoCorasick(read_lexicon(self.path))
+            self._matcher, self._mtime = matcher, mtime
+            logger.info(f"Lexicon loaded: {self.path} ({len(matcher)} terms)")
+        except OSError as e:
+            logger.error(f"[LEXICON ERROR] {self.path}: {e}")
+            if self._matcher is None:
+                self._matcher = AhoCorasick({})
+
+    def reload(self):
+        with self._lock:
+            self._mtime = None
+            self._load()
+            self._checked = time.monotonic()
+
+    @property
+    def matcher(self) -> AhoCorasick:
+        now = time.monotonic()
+        if self._matcher is None or now - self._checked >= self.check_seconds:
+            with self._lock:
+                if self._matcher is None or now - self._checked >= self.check_seconds:
+                    self._load()
+                    self._checked = now
+        return self._matcher
+
+    def contains(self, text: str) -> bool:
+        return self.matcher.contains(text)
+
+    def first(self, text: str):
+        return self.matcher.first(text)
+
+    def find_all(self, text: str) -> list:
+        return self.matcher.find_all(text)
+
+
+toxic_terms = Lexicon(TOXIC_LEXICON_PATH)
+places = Lexicon(GAZETTEER_PATH)
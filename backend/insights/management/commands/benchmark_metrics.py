@@ -0,0 +1,59 @@
+import random
+import time
+from datetime import datetime, timedelta
+
+from django.core.management.base import BaseCommand
+
+from insights.metrics import MetricsAccumulator
+from insights.metrics_columnar import accumulate_columnar
+
+
+def synthetic_insights(n: int, seed: int = 42) -> list:
+    rng = random.Random(seed)
+    start = datetime(2020, 1, 1)
+    insights = []
+    for _ in range(n):
+        created = start + timedelta(seconds=rng.randint(0, 5 * 365 * 24 * 3600))
+        insights.append({
+            "type": "post" if rng.random() < 0.6 else "comment",
+            "label": rng.choice(["positive", "negative", "neutral"]),
+            "timestamp": created.strftime("%Y-%m-%dT%H:%M:%S+0000"),
+            "mentions_location": "Colombo" if rng.random() < 0.1 else None,
+            "is_respectful": rng.random() < 0.9,
+            "translated": "sample post",
+        })
+    return insights
+
+
+def best_of(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+class Command(BaseCommand):
+    help = "Compare the per-item metrics loop with the columnar NumPy path."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sizes", default="10,100,1000,10000,100000")
+        parser.add_argument("--repeat", type=int, default=3)
+
+    def handle(self, *args, **options):
+        sizes = [int(s) for s in options["sizes"].split(",") if s]
+        self.stdout.write(f"{'items':>8} {'loop ms':>10} {'columnar ms':>12} {'speedup':>8}  match")
+
+        for n in sizes:
+            insights = synthetic_insights(n)
+            loop = best_of(lambda: MetricsAccumulator.from_insights(insights), options["repeat"])
+            columnar = best_of(lambda: accumulate_columnar(insights), options["repeat"])
+            match = (
+                MetricsAccumulator.from_insights(insights).metrics()
+                == accumulate_columnar(insights).metrics()
+            )
+            self.stdout.write(
+                f"{n:>8} {loop * 1000:>10.2f} {columnar * 1000:>12.2f} "
+                f"{loop / columnar if columnar else 0:>7.1f}x  {match}"
+            )
@@ -0,0 +1,47 @@
+import json
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from insights.hf_models import SENTIMENT_MODEL, TOXIC_MODEL, MISINFO_MODEL
+from insights.optimized_models import OPTIMIZED_MODEL_DIR, parity_report
+
+DEFAULT_CORPUS = Path(__file__).resolve().parents[2] / "parity_corpus.txt"
+
+
+class Command(BaseCommand):
+    help = "Report label parity and latency of int8/ONNX classifiers against fp32."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--runtime", choices=["int8", "onnx"], default="int8")
+        parser.add_argument("--corpus", default=str(DEFAULT_CORPUS))
+        parser.add_argument("--models-dir", default=str(OPTIMIZED_MODEL_DIR))
+        parser.add_argument("--json", action="store_true", help="Print the full report as JSON")
+
+    def handle(self, *args, **options):
+        texts = [
+            line.strip()
+            for line in Path(options["corpus"]).read_text(encoding="utf-8").splitlines()
+            if line.strip()
+        ]
+
+        try:
+            reports = [
+                parity_report(model_id, options["runtime"], texts, options["models_dir"])
+                for model_id in (SENTIMENT_MODEL, TOXIC_MODEL, MISINFO_MODEL)
+            ]
+        except (ImportError, FileNotFoundError) as e:
+            raise CommandError(str(e)) from e
+
+        if options["json"]:
+            self.stdout.write(json.dumps(reports, indent=2))
+            return
+
+        runtime = options["runtime"]
+        for report in reports:
+            self.stdout.write(
+                f"{report['model']}: agreement={report['agreement']:.2%} "
+                f"flips={len(report['flips'])}/{report['texts']} "
+                f"drift(mean/max)={report['mean_score_drift']}/{report['max_score_drift']} "
+                f"latency fp32={report['fp32_ms']}ms {runtime}={report[f'{runtime}_ms']}ms"
+            )
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from insights import insight_store, report_store
+
+
+class Command(BaseCommand):
+    help = "Create the MongoDB indexes for reports and stored post insights (also done lazily on first write)."
+
+    def handle(self, *args, **options):
+        try:
+            report_store.ensure_indexes()
+            insight_store.ensure_indexes()
+        except Exception as e:
+            raise CommandError(f"Could not create indexes: {e}") from e
+        self.stdout.write(self.style.SUCCESS("MongoDB indexes are in place."))
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from insights.hf_models import SENTIMENT_MODEL, TOXIC_MODEL, MISINFO_MODEL
+from insights.optimized_models import OPTIMIZED_MODEL_DIR, export_model
+
+
+class Command(BaseCommand):
+    help = "Export int8-quantized or ONNX copies of the local classifiers."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--runtime", choices=["int8", "onnx"], default="int8")
+        parser.add_argument("--output", default=str(OPTIMIZED_MODEL_DIR))
+
+    def handle(self, *args, **options):
+        for model_id in (SENTIMENT_MODEL, TOXIC_MODEL, MISINFO_MODEL):
+            try:
+                out = export_model(model_id, options["runtime"], options["output"])
+            except ImportError as e:
+                raise CommandError(str(e)) from e
+            self.stdout.write(f"{model_id} -> {out}")
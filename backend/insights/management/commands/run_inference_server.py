@@ -0,0 +1,26 @@
+import os
+
+from django.core.management.base import BaseCommand
+
+from insights.sidecar_models import SIDECAR_SOCKET
+
+
+class Command(BaseCommand):
+    help = "Serve the local models to every worker on this host (INFERENCE_BACKEND=sidecar)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--socket", default=SIDECAR_SOCKET, help="UNIX socket to listen on")
+        parser.add_argument("--host", default="127.0.0.1")
+        parser.add_argument("--port", type=int, help="Listen on host:port instead of the socket")
+
+    def handle(self, *args, **options):
+        import uvicorn
+
+        # One process on purpose: the point is a single copy of the models
+        if options["port"]:
+            uvicorn.run("insights.inference_server:app", host=options["host"], port=options["port"], workers=1)
+            return
+
+        if os.path.exists(options["socket"]):
+            os.remove(options["socket"])
+        uvicorn.run("insights.inference_server:app", uds=options["socket"], workers=1)
@@ -0,0 +1,73 @@
+import json
+import random
+
+from django.core.management.base import BaseCommand, CommandError
+
+from insights.cascade import CASCADE_MODEL_PATH, CASCADE_THRESHOLD, HashedLinearModel, tier1
+
+
+def samples_from_store(limit: int) -> list:
+    """Distill from analyses the remote model already stored per post."""
+    from insights.insight_store import post_insights_collection
+
+    cursor = post_insights_collection.find({}, {"_id": 0, "insight": 1}).limit(limit)
+    return [
+        {
+            "text": doc["insight"].get("translated") or doc["insight"].get("original"),
+            "label": doc["insight"].get("label"),
+            "toxic": doc["insight"].get("toxic"),
+            "misinformation": doc["insight"].get("misinformation_risk"),
+        }
+        for doc in cursor
+        if doc.get("insight") and (doc["insight"].get("translated") or doc["insight"].get("original"))
+    ]
+
+
+class Command(BaseCommand):
+    help = "Train the tier-1 hashed n-gram classifier used by the cascade backend."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--data", help='JSONL of {"text", "label", "toxic", "misinformation"}; '
+                                           "defaults to stored post insights")
+        parser.add_argument("--limit", type=int, default=200000)
+        parser.add_argument("--epochs", type=int, default=5)
+        parser.add_argument("--holdout", type=float, default=0.1)
+        parser.add_argument("--threshold", type=float, default=CASCADE_THRESHOLD)
+        parser.add_argument("--output", default=str(CASCADE_MODEL_PATH))
+
+    def handle(self, *args, **options):
+        if options["data"]:
+            with open(options["data"], encoding="utf-8") as f:
+                samples = [json.loads(line) for line in f if line.strip()][:options["limit"]]
+        else:
+            samples = samples_from_store(options["limit"])
+        if not samples:
+            raise CommandError("No training samples")
+
+        random.Random(0).shuffle(samples)
+        split = int(len(samples) * (1 - options["holdout"]))
+        train, holdout = samples[:split], samples[split:]
+
+        model = HashedLinearModel().fit(train, epochs=options["epochs"])
+        model.save(options["output"])
+        self.stdout.write(f"Trained on {len(train)} samples -> {options['output']}")
+
+        # Coverage and agreement on held-out texts at the serving threshold
+        import insights.cascade as cascade
+        cascade._model, cascade._model_failed = model, False
+        answered = agreed = 0
+        for sample in holdout:
+            result = tier1(sample["text"], options["threshold"])
+            if result is None:
+                continue
+            answered += 1
+            agreed += (
+                result["label"] == sample.get("label")
+                and result["toxic"] == bool(sample.get("toxic"))
+                and result["misinformation"] == bool(sample.get("misinformation"))
+            )
+        if holdout:
+            self.stdout.write(
+                f"Holdout: {len(holdout)} texts, answered locally {answered / len(holdout):.1%}, "
+                f"agreement on those {agreed / answered if answered else 0:.1%}"
+            )
@@ -0,0 +1,170 @@
+# backend/insights/metrics.py
+
+import logging
+
+import pytz
+from dateutil import parser
+
+logger = logging.getLogger(__name__)
+LOCAL_TZ = pytz.timezone("Asia/Colombo")
+
+SAMPLE_SIZE = 5
+STATE_VERSION = 1
+# Everything build_metrics and the analyzers can produce
+METRIC_TITLES = ("Happy Posts", "Good Posting Habits", "Privacy Care", "Being Respectful")
+INSIGHT_TYPES = ("post", "comment")
+SENTIMENTS = ("positive", "negative", "neutral")
+
+
+def post_timestamp(item: dict):
+    return item.get("timestamp") or item.get("time") or item.get("created_time")
+
+
+def is_night_time(ts: str) -> bool:
+    """True if ``ts`` falls between 23:00 and 06:00 local time."""
+    dt = parser.parse(ts)
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=pytz.UTC)
+
+    local_dt = dt.astimezone(LOCAL_TZ)
+    return local_dt.hour >= 23 or local_dt.hour < 6
+
+
+def habits_score(night_posts: int, total_posts: int) -> int:
+    if total_posts == 0:
+        return 100
+
+    late_ratio = night_posts / total_posts
+
+    if late_ratio == 0:
+        return 100
+    elif late_ratio <= 0.2:
+        return 80
+    elif late_ratio <= 0.4:
+        return 60
+    elif late_ratio <= 0.6:
+        return 40
+    return 20
+
+
+def build_metrics(items, positive, night_posts, total_posts, location_mentions, respectful_count) -> list:
+    total_items = max(items, 1)
+    return [
+        {"title": "Happy Posts", "value": round((positive / total_items) * 100)},
+        {"title": "Good Posting Habits", "value": habits_score(night_posts, total_posts)},
+        {"title": "Privacy Care", "value": round(100 - (location_mentions / total_items) * 100)},
+        {"title": "Being Respectful", "value": round((respectful_count / total_items) * 100)},
+    ]
+
+
+class MetricsAccumulator:
+    """
+    Running counters behind the insight metrics.
+
+    Insights are added one at a time, accumulators from parallel shards
+    or earlier reports can be merged, and the state round-trips through
+    ``to_dict``/``from_dict`` so it can be stored with a report. The
+    final scores are computed from the counters in constant time. A few
+    sample insights are kept for the recommendation prompt.
+    """
+
+    def __init__(self):
+        self.items = 0
+        self.posts = 0
+        self.sentiment = dict.fromkeys(SENTIMENTS, 0)
+        self.night_posts = 0
+        self.location_mentions = 0
+        self.respectful = 0
+        self.samples = []
+
+    @classmethod
+    def from_insights(cls, insights) -> "MetricsAccumulator":
+        acc = cls()
+        for insight in insights:
+            acc.add(insight)
+        return acc
+
+    def add(self, item: dict) -> "MetricsAccumulator":
+        # Items the model failed on say nothing about the user
+        if item.get("error"):
+            return self
+        self.items += 1
+
+        label = (item.get("label") or "").lower()
+        if label in self.sentiment:
+            self.sentiment[label] += 1
+
+        if item.get("mentions_location"):
+            self.location_mentions += 1
+
+        if item.get("is_respectful"):
+            self.respectful += 1
+
+        translated = item.get("translated")
+        if len(self.samples) < SAMPLE_SIZE and translated and translated.strip():
+            self.samples.append(item)
+
+        # Posting habits only count posts, not comments
+        if str(item.get("type", "")).lower() == "post":
+            self.posts += 1
+            ts = post_timestamp(item)
+            if ts:
+                try:
+                    if is_night_time(ts):
+                        self.night_posts += 1
+                except Exception as e:
+                    logger.warning(f"Timestamp parse failed: {ts} | {e}")
+
+        return self
+
+    def merge(self, other: "MetricsAccumulator") -> "MetricsAccumulator":
+        self.items += other.items
+        self.posts += other.posts
+        for label, count in other.sentiment.items():
+            self.sentiment[label] = self.sentiment.get(label, 0) + count
+        self.night_posts += other.night_posts
+        self.location_mentions += other.location_mentions
+        self.respectful += other.respectful
+        self.samples = (self.samples + other.samples)[:SAMPLE_SIZE]
+        return self
+
+    def metrics(self) -> list:
+        logger.info(
+            f"Posting habits debug → total_posts={self.posts}, night_posts={self.night_posts}"
+        )
+        return build_metrics(
+            self.items,
+            self.sentiment["positive"],
+            self.night_posts,
+            self.posts,
+            self.location_mentions,
+            self.respectful,
+        )
+
+    def to_dict(self) -> dict:
+        return {
+            "version": STATE_VERSION,
+            "items": self.items,
+            "posts": self.posts,
+            "sentiment": dict(self.sentiment),
+            "night_posts": self.night_posts,
+            "location_mentions": self.location_mentions,
+            "respectful": self.respectful,
+            "samples": list(self.samples),
+        }
+
+    @classmethod
+    def from_dict(cls, state: dict) -> "MetricsAccumulator":
+        acc = cls()
+        if not state:
+            return acc
+        if state.get("version") != STATE_VERSION:
+            raise ValueError(f"Unsupported metrics state version: {state.get('version')}")
+        acc.items = state["items"]
+        acc.posts = state["posts"]
+        acc.sentiment.update(state["sentiment"])
+        acc.night_posts = state["night_posts"]
+        acc.location_mentions = state["location_mentions"]
+        acc.respectful = state["respectful"]
+        acc.samples = list(state.get("samples", []))[:SAMPLE_SIZE]
+        return acc
@@ -0,0 +1,128 @@
+# backend/insights/metrics_columnar.py
+
+import logging
+from datetime import datetime
+
+import numpy as np
+
+from insights.metrics import (
+    LOCAL_TZ,
+    SAMPLE_SIZE,
+    MetricsAccumulator,
+    is_night_time,
+    post_timestamp,
+)
+
+logger = logging.getLogger(__name__)
+
+# Graph always returns created_time as "YYYY-MM-DDTHH:MM:SS+HHMM"
+GRAPH_TS_WIDTH = 24
+_DIGITS = [0, 1, 2, 3, 5, 6, 8, 9, 11, 12, 14, 15, 17, 18, 20, 21, 22, 23]
+_SEPARATORS = {4: b"-", 7: b"-", 10: b"T", 13: b":", 16: b":"}
+
+
+def local_offset_seconds(tz=LOCAL_TZ) -> int:
+    # Asia/Colombo has had a fixed +05:30 offset since 2006, so one
+    # offset applies to the whole vector.
+    return int(tz.utcoffset(datetime.utcnow()).total_seconds())
+
+
+def parse_graph_times(timestamps) -> tuple:
+    """
+    Parse Graph ``created_time`` strings in bulk.
+
+    Returns ``(utc_seconds, valid)``: int64 seconds since the epoch and a
+    mask of rows that matched the fixed format. The strings are viewed as
+    a byte matrix so every field is decoded with array arithmetic.
+    """
+    try:
+        raw = np.asarray([t or "" for t in timestamps], dtype=f"S{GRAPH_TS_WIDTH}")
+    except UnicodeEncodeError:
+        raw = np.asarray([t if t and t.isascii() else "" for t in timestamps], dtype=f"S{GRAPH_TS_WIDTH}")
+    if raw.size == 0:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=bool)
+
+    chars = raw.view(np.uint8).reshape(-1, GRAPH_TS_WIDTH)
+    digits = chars.astype(np.int64) - ord("0")
+
+    valid = np.all((digits[:, _DIGITS] >= 0) & (digits[:, _DIGITS] <= 9), axis=1)
+    for pos, sep in _SEPARATORS.items():
+        valid &= chars[:, pos] == sep[0]
+    sign = np.where(chars[:, 19] == ord("-"), -1, 1)
+    valid &= (chars[:, 19] == ord("+")) | (chars[:, 19] == ord("-"))
+
+    def field(start, width):
+        value = np.zeros(len(chars), dtype=np.int64)
+        for i in range(start, start + width):
+            value = value * 10 + digits[:, i]
+        return value
+
+    year, month, day = field(0, 4), field(5, 2), field(8, 2)
+    valid &= (month >= 1) & (month <= 12) & (day >= 1) & (day <= 31)
+    month = np.where(valid, month, 1)
+    day = np.where(valid, day, 1)
+    year = np.where(valid, year, 1970)
+
+    months = ((year - 1970) * 12 + (month - 1)).astype("datetime64[M]")
+    days = months.astype("datetime64[D]") + (day - 1).astype("timedelta64[D]")
+    seconds = days.astype("datetime64[s]").astype(np.int64)
+    seconds += field(11, 2) * 3600 + field(14, 2) * 60 + field(17, 2)
+    seconds -= sign * (field(20, 2) * 3600 + field(22, 2) * 60)
+
+    return seconds, valid
+
+
+def night_post_mask(timestamps, tz=LOCAL_TZ) -> np.ndarray:
+    """Vectorized ``is_night_time``; odd formats fall back to dateutil."""
+    seconds, valid = parse_graph_times(timestamps)
+    local_hour = ((seconds + local_offset_seconds(tz)) // 3600) % 24
+    night = valid & ((local_hour >= 23) | (local_hour < 6))
+
+    for i in np.flatnonzero(~valid):
+        ts = timestamps[i]
+        if not ts:
+            continue
+        try:
+            night[i] = is_night_time(ts)
+        except Exception as e:
+            logger.warning(f"Timestamp parse failed: {ts} | {e}")
+    return night
+
+
+def columns_from_insights(insights: list) -> dict:
+    """Split insight dicts into one array per field the metrics need."""
+    return {
+        "label": np.array([(i.get("label") or "").lower() for i in insights], dtype=object),
+        "is_post": np.array([str(i.get("type", "")).lower() == "post" for i in insights], dtype=bool),
+        "timestamp": [post_timestamp(i) for i in insights],
+        "mentions_location": np.array([bool(i.get("mentions_location")) for i in insights], dtype=bool),
+        "is_respectful": np.array([bool(i.get("is_respectful")) for i in insights], dtype=bool),
+    }
+
+
+def accumulate_columnar(insights: list) -> MetricsAccumulator:
+    """
+    Same result as ``MetricsAccumulator.from_insights`` but with the
+    counters computed as array reductions.
+    """
+    insights = [i for i in insights if not i.get("error")]
+    columns = columns_from_insights(insights)
+    is_post = columns["is_post"]
+    post_times = [ts for ts, post in zip(columns["timestamp"], is_post) if post]
+
+    acc = MetricsAccumulator()
+    acc.items = len(insights)
+    acc.posts = int(np.count_nonzero(is_post))
+    for label in acc.sentiment:
+        acc.sentiment[label] = int(np.count_nonzero(columns["label"] == label))
+    acc.night_posts = int(np.count_nonzero(night_post_mask(post_times))) if post_times else 0
+    acc.location_mentions = int(np.count_nonzero(columns["mentions_location"]))
+    acc.respectful = int(np.count_nonzero(columns["is_respectful"]))
+
+    for item in insights:
+        if len(acc.samples) >= SAMPLE_SIZE:
+            break
+        translated = item.get("translated")
+        if translated and translated.strip():
+            acc.samples.append(item)
+    return acc
@@ -0,0 +1,34 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PostInsight',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('post_id', models.CharField(max_length=200, unique=True)),
+                ('user_id', models.CharField(max_length=200)),
+                ('original_text', models.TextField()),
+                ('translated_text', models.TextField(blank=True, null=True)),
+                ('sentiment', models.CharField(default='neutral', max_length=50)),
+                ('is_respectful', models.BooleanField(default=True)),
+                ('mentions_location', models.CharField(blank=True, max_length=200, null=True)),
+                ('privacy_disclosure', models.BooleanField(default=False)),
+                ('toxic', models.BooleanField(default=False)),
+                ('misinformation_risk', models.BooleanField(default=False)),
+                ('status_type', models.CharField(blank=True, max_length=50, null=True)),
+                ('timestamp', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['-timestamp'],
+            },
+        ),
+    ]
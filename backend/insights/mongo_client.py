@@ -1,7 +1,9 @@
 from pymongo import MongoClient
 from urllib.parse import quote_plus
 import os
+import time
 import logging
+import threading
 
 logger = logging.getLogger(__name__)
 
@@ -12,19 +14,72 @@ database = os.getenv("MONGO_DB", "digital_responsibility")
 
 MONGO_URI = f"mongodb+srv://{username}:{password}@{cluster}/{database}?retryWrites=true&w=majority"
 
-try:
-    client = MongoClient(
-        MONGO_URI,
-        serverSelectionTimeoutMS=5000  
-    )
+MONGO_MAX_POOL_SIZE = int(os.getenv("MONGO_MAX_POOL_SIZE", "20"))
+MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.getenv("MONGO_SERVER_SELECTION_TIMEOUT_MS", "5000"))
+MONGO_CONNECT_TIMEOUT_MS = int(os.getenv("MONGO_CONNECT_TIMEOUT_MS", "5000"))
+MONGO_SOCKET_TIMEOUT_MS = int(os.getenv("MONGO_SOCKET_TIMEOUT_MS", "30000"))
 
-    # FORCE CONNECTION
-    client.admin.command("ping")
-    logger.info("MongoDB CONNECTED")
+# One client per process. A client created before gunicorn or Celery
+# forks must not be used by the children, so it is keyed by pid.
+_clients = {}
+_clients_lock = threading.Lock()
 
-except Exception as e:
-    logger.error(f"MongoDB CONNECTION FAILED: {e}")
-    raise  # VERY IMPORTANT
 
-db = client[database]
+def get_client() -> MongoClient:
+    """
+    This process's client, created on first use. ``connect=False`` means
+    no network traffic until the first operation.
+    """
+    pid = os.getpid()
+    client = _clients.get(pid)
+    if client is None:
+        with _clients_lock:
+            client = _clients.get(pid)
+            if client is None:
+                client = MongoClient(
+                    MONGO_URI,
+                    connect=False,
+                    maxPoolSize=MONGO_MAX_POOL_SIZE,
+                    serverSelectionTimeoutMS=MONGO_SERVER_SELECTION_TIMEOUT_MS,
+                    connectTimeoutMS=MONGO_CONNECT_TIMEOUT_MS,
+                    socketTimeoutMS=MONGO_SOCKET_TIMEOUT_MS,
+                )
+                _clients[pid] = client
+    return client
+
+
+def get_db():
+    return get_client()[database]
+
+
+def health_check() -> dict:
+    """Ping the server. Not called implicitly; for health endpoints and startup checks."""
+    start = time.perf_counter()
+    try:
+        get_client().admin.command("ping")
+    except Exception as e:
+        logger.error(f"MongoDB HEALTH CHECK FAILED: {e}")
+        return {"ok": False, "error": str(e)}
+    return {"ok": True, "latency_ms": round((time.perf_counter() - start) * 1000, 1)}
+
+
+class _Lazy:
+    """Stands in for a database or collection, resolved in the calling process on each use."""
+
+    def __init__(self, resolve):
+        self._resolve = resolve
+
+    def __getattr__(self, name):
+        return getattr(self._resolve(), name)
+
+    def __getitem__(self, name):
+        resolve = self._resolve
+        return _Lazy(lambda: resolve()[name])
+
+    def __repr__(self):
+        return f"<lazy {self._resolve()!r}>"
+
+
+# Import-compatible names; nothing connects until they are used
+db = _Lazy(get_db)
 reports_collection = db["reports"]
@@ -0,0 +1,226 @@
+# backend/insights/optimized_models.py
+
+import os
+import re
+import logging
+from importlib import import_module
+from pathlib import Path
+from types import SimpleNamespace
+
+logger = logging.getLogger(__name__)
+
+RUNTIMES = ("fp32", "int8", "onnx")
+LOCAL_MODEL_RUNTIME = os.getenv("LOCAL_MODEL_RUNTIME", "fp32")
+OPTIMIZED_MODEL_DIR = Path(os.getenv(
+    "OPTIMIZED_MODEL_DIR",
+    Path(__file__).resolve().parent.parent / "optimized_models",
+))
+ONNX_OPSET = 17
+
+
+def require(module: str, runtime: str):
+    """Import an optional runtime dependency, naming the runtime that needs it."""
+    try:
+        return import_module(module)
+    except ImportError as e:
+        raise ImportError(
+            f"The {runtime} runtime needs the {module!r} package; "
+            f"install it with pip install -r requirements.txt"
+        ) from e
+
+
+def model_dir(model_id: str, runtime: str, root: Path = OPTIMIZED_MODEL_DIR) -> Path:
+    return Path(root) / runtime / re.sub(r"[^A-Za-z0-9_.-]+", "__", model_id)
+
+
+# -----------------------------
+# Export
+# -----------------------------
+def _quantize(model):
+    import torch
+
+    return torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+
+def export_model(model_id: str, runtime: str, root: Path = OPTIMIZED_MODEL_DIR) -> Path:
+    """
+    Write an optimized copy of a sequence-classification model.
+
+    int8: dynamically quantized Linear layers, saved as a state dict.
+    onnx: an ONNX graph with dynamic batch/sequence axes.
+    The tokenizer and config are saved next to the weights either way.
+    """
+    import torch
+    from transformers import AutoModelForSequenceClassification, AutoTokenizer
+
+    if runtime not in ("int8", "onnx"):
+        raise ValueError(f"Nothing to export for runtime {runtime!r}")
+
+    out = model_dir(model_id, runtime, root)
+    out.mkdir(parents=True, exist_ok=True)
+
+    tokenizer = AutoTokenizer.from_pretrained(model_id)
+    model = AutoModelForSequenceClassification.from_pretrained(model_id).eval()
+    tokenizer.save_pretrained(out)
+    model.config.save_pretrained(out)
+
+    if runtime == "int8":
+        torch.save(_quantize(model).state_dict(), out / "model_int8.pt")
+        return out
+
+    # torch.onnx.export writes the graph through these
+    require("onnx", runtime)
+    require("onnxscript", runtime)
+    sample = tokenizer(["export sample"], return_tensors="pt")
+    input_names = list(sample.keys())
+    dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names}
+    dynamic_axes["logits"] = {0: "batch"}
+    torch.onnx.export(
+        model,
+        (dict(sample),),
+        str(out / "model.onnx"),
+        input_names=input_names,
+        output_names=["logits"],
+        dynamic_axes=dynamic_axes,
+        opset_version=ONNX_OPSET,
+    )
+    return out
+
+
+# -----------------------------
+# Runtime
+# -----------------------------
+class OnnxSequenceModel:
+    """Minimal stand-in for a transformers model backed by onnxruntime."""
+
+    def __init__(self, path: Path, config):
+        ort = require("onnxruntime", "onnx")
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = ort.InferenceSession(
+            str(path), sess_options=options, providers=["CPUExecutionProvider"]
+        )
+        self.input_names = [i.name for i in self.session.get_inputs()]
+        self.config = config
+
+    def __call__(self, **features):
+        import torch
+
+        feeds = {
+            name: features[name].cpu().numpy() if hasattr(features[name], "cpu") else features[name]
+            for name in self.input_names if name in features
+        }
+        logits = self.session.run(["logits"], feeds)[0]
+        return SimpleNamespace(logits=torch.from_numpy(logits))
+
+
+class OnnxClassifier:
+    """Pipeline-compatible text classifier for the ONNX runtime."""
+
+    def __init__(self, path: Path, max_length: int = 256):
+        from transformers import AutoConfig, AutoTokenizer
+
+        self.tokenizer = AutoTokenizer.from_pretrained(path)
+        self.model = OnnxSequenceModel(path / "model.onnx", AutoConfig.from_pretrained(path))
+        self.max_length = max_length
+
+    def __call__(self, texts, **kwargs):
+        single = isinstance(texts, str)
+        features = self.tokenizer(
+            [texts] if single else list(texts),
+            truncation=True, max_length=self.max_length, padding=True, return_tensors="np",
+        )
+        probs = self.model(**features).logits.softmax(dim=-1)
+        scores, ids = probs.max(dim=-1)
+        return [
+            {"label": self.model.config.id2label[i], "score": float(s)}
+            for i, s in zip(ids.tolist(), scores.tolist())
+        ]
+
+
+def _load_int8(path: Path, max_length: int):
+    import torch
+    from transformers import AutoConfig, AutoModelForSequenceClassification, AutoTokenizer, pipeline
+
+    config = AutoConfig.from_pretrained(path)
+    model = _quantize(AutoModelForSequenceClassification.from_config(config).eval())
+    model.load_state_dict(torch.load(path / "model_int8.pt", weights_only=False))
+    tokenizer = AutoTokenizer.from_pretrained(path)
+    return pipeline(
+        "text-classification", model=model, tokenizer=tokenizer,
+        device=-1, truncation=True, max_length=max_length,
+    )
+
+
+def load_classifier(model_id: str, runtime: str = LOCAL_MODEL_RUNTIME,
+                    max_length: int = 256, root: Path = OPTIMIZED_MODEL_DIR):
+    """
+    Load a text classifier for ``runtime``. Anything exposing
+    ``__call__``, ``.tokenizer`` and ``.model`` like a transformers
+    pipeline is returned. Optimized runtimes need ``export_model`` to
+    have been run first.
+    """
+    if runtime not in RUNTIMES:
+        raise ValueError(f"Unknown runtime {runtime!r}, expected one of {RUNTIMES}")
+
+    if runtime == "fp32":
+        from transformers import pipeline
+
+        return pipeline(
+            "text-classification", model=model_id,
+            device=-1, truncation=True, max_length=max_length,
+        )
+
+    path = model_dir(model_id, runtime, root)
+    if not path.exists():
+        raise FileNotFoundError(
+            f"No {runtime} export for {model_id} at {path}; run manage.py export_local_models"
+        )
+    if runtime == "int8":
+        return _load_int8(path, max_length)
+    return OnnxClassifier(path, max_length)
+
+
+# -----------------------------
+# Parity
+# -----------------------------
+def parity_report(model_id: str, runtime: str, texts: list, root: Path = OPTIMIZED_MODEL_DIR) -> dict:
+    """
+    Compare ``runtime`` against fp32 on ``texts``: label agreement, the
+    texts whose label flipped, score drift where labels agree, and the
+    per-text latency of each runtime.
+    """
+    import time
+
+    reference = load_classifier(model_id, "fp32", root=root)
+    candidate = load_classifier(model_id, runtime, root=root)
+
+    def run(classifier):
+        started = time.perf_counter()
+        preds = [classifier(text)[0] for text in texts]
+        return preds, (time.perf_counter() - started) / max(len(texts), 1)
+
+    ref_preds, ref_latency = run(reference)
+    cand_preds, cand_latency = run(candidate)
+
+    flips = [
+        {"text": text, "fp32": ref["label"], runtime: cand["label"]}
+        for text, ref, cand in zip(texts, ref_preds, cand_preds)
+        if ref["label"] != cand["label"]
+    ]
+    drift = [
+        abs(ref["score"] - cand["score"])
+        for ref, cand in zip(ref_preds, cand_preds)
+        if ref["label"] == cand["label"]
+    ]
+    return {
+        "model": model_id,
+        "runtime": runtime,
+        "texts": len(texts),
+        "agreement": round(1 - len(flips) / max(len(texts), 1), 4),
+        "flips": flips,
+        "mean_score_drift": round(sum(drift) / len(drift), 4) if drift else 0.0,
+        "max_score_drift": round(max(drift), 4) if drift else 0.0,
+        "fp32_ms": round(ref_latency * 1000, 2),
+        f"{runtime}_ms": round(cand_latency * 1000, 2),
+    }
@@ -0,0 +1,149 @@
+# backend/insights/pii.py
+
+import os
+import re
+from dataclasses import dataclass
+
+# Spans below this confidence do not count as a disclosure
+PII_MIN_CONFIDENCE = float(os.getenv("PII_MIN_CONFIDENCE", "0.6"))
+# Kinds checked by has_personal_info; "link" (profile links) is opt-in
+PII_KINDS = tuple(k.strip() for k in os.getenv("PII_KINDS", "phone,email,nic,address").split(",") if k.strip())
+
+
+@dataclass(frozen=True)
+class PIISpan:
+    kind: str
+    start: int
+    end: int
+    text: str
+    confidence: float
+
+
+# -----------------------------
+# Patterns
+# -----------------------------
+_SEP = r"[\s.\-]?"
+_DIGIT_RUN = rf"(?:{_SEP}\d)"
+
+# Sri Lankan mobiles: 07X XXX XXXX, +94 7X XXX XXXX, 0094..., 94...
+SL_MOBILE = re.compile(rf"(?<![\w+])(?:\+94|0094|94|0){_SEP}\(?7[0124-8]\)?{_DIGIT_RUN}{{7}}(?!\d)")
+# Sri Lankan landlines: 011 234 5678, +94 81 234 5678
+SL_LANDLINE = re.compile(rf"(?<![\w+])(?:\+94|0094|0){_SEP}\(?(?:1[1-9]|[2-689]\d)\)?{_DIGIT_RUN}{{7}}(?!\d)")
+# Any other +country number
+INTL_PHONE = re.compile(r"(?<![\w+])\+[1-9](?:[\s.\-()]{0,2}\d){6,13}(?!\d)")
+# Bare digit runs; what the remote Space reported as phones
+DIGIT_RUN = re.compile(r"(?<!\d)\d{10,13}(?!\d)")
+
+EMAIL = re.compile(r"(?<![\w.+-])[A-Za-z0-9_.+-]+@[A-Za-z0-9-]+(?:\.[A-Za-z0-9-]+)*\.[A-Za-z]{2,}")
+OBFUSCATED_EMAIL = re.compile(
+    r"(?<![\w.])[A-Za-z0-9_.+-]+(?:\s*[\[(]at[\])]\s*|\s+at\s+)[A-Za-z0-9-]+"
+    r"(?:\s*[\[(]dot[\])]\s*|\s+dot\s+)[A-Za-z]{2,}\b",
+    re.IGNORECASE,
+)
+
+# Old NIC: 9 digits + V/X. New NIC: 12 digits starting with the birth year.
+NIC_OLD = re.compile(r"(?<!\w)(\d{2})(\d{3})\d{4}[VvXx](?!\w)")
+NIC_NEW = re.compile(r"(?<!\d)((?:19|20)\d{2})(\d{3})\d{5}(?!\d)")
+NIC_CONTEXT = re.compile(r"\b(?:nic|n\.i\.c|id|identity)\b", re.IGNORECASE)
+
+# "No. 12, Galle Road", "45/3 Temple Lane", "221B Baker Street"
+ADDRESS = re.compile(
+    r"(?<!\w)(?P<no>No\.?\s*)?\d{1,4}[A-Za-z]?(?:/\d{1,4}[A-Za-z]?)?,?\s+"
+    r"(?:[A-Z][\w'.\-]*,?\s+){1,4}"
+    r"(?i:road|rd|street|st|mawatha|mw|lane|ln|avenue|ave|place|pl|gardens|drive|dr|terrace|para|watta|cross street)\b\.?"
+)
+
+PROFILE_LINK = re.compile(
+    r"(?<![\w/])(?:https?://)?(?:www\.|m\.)?"
+    r"(?:(?:facebook|fb|instagram|twitter|x|tiktok|youtube|github)\.com/@?|linkedin\.com/in/|t\.me/|wa\.me/)"
+    r"[\w.\-]+",
+    re.IGNORECASE,
+)
+
+
+# -----------------------------
+# Detectors
+# -----------------------------
+def _valid_nic_day(day: int) -> bool:
+    # Women's NICs add 500 to the day of the year
+    return 1 <= day <= 366 or 501 <= day <= 866
+
+
+def _span(kind, match, confidence) -> PIISpan:
+    return PIISpan(kind, match.start(), match.end(), match.group(0), confidence)
+
+
+def detect_phones(text: str) -> list:
+    spans = [_span("phone", m, 0.95) for m in SL_MOBILE.finditer(text)]
+    spans += [_span("phone", m, 0.8) for m in SL_LANDLINE.finditer(text)]
+    spans += [_span("phone", m, 0.85) for m in INTL_PHONE.finditer(text)]
+    spans += [_span("phone", m, 0.6) for m in DIGIT_RUN.finditer(text)]
+    return spans
+
+
+def detect_emails(text: str) -> list:
+    spans = [_span("email", m, 0.99) for m in EMAIL.finditer(text)]
+    spans += [_span("email", m, 0.7) for m in OBFUSCATED_EMAIL.finditer(text)]
+    return spans
+
+
+def detect_nics(text: str) -> list:
+    spans = []
+    for pattern, confidence in ((NIC_OLD, 0.9), (NIC_NEW, 0.75)):
+        for m in pattern.finditer(text):
+            if not _valid_nic_day(int(m.group(2))):
+                continue
+            labelled = NIC_CONTEXT.search(text, max(0, m.start() - 20), m.start())
+            spans.append(_span("nic", m, 0.98 if labelled else confidence))
+    return spans
+
+
+def detect_addresses(text: str) -> list:
+    return [_span("address", m, 0.9 if m.group("no") else 0.75) for m in ADDRESS.finditer(text)]
+
+
+def detect_links(text: str) -> list:
+    return [
+        _span("link", m, 0.9 if "wa.me/" in m.group(0).lower() else 0.6)
+        for m in PROFILE_LINK.finditer(text)
+    ]
+
+
+DETECTORS = {
+    "nic": detect_nics,
+    "email": detect_emails,
+    "phone": detect_phones,
+    "address": detect_addresses,
+    "link": detect_links,
+}
+
+
+def _resolve_overlaps(spans: list) -> list:
+    """Keep the most confident span wherever detections overlap."""
+    kept = []
+    for span in sorted(spans, key=lambda s: (-s.confidence, s.start)):
+        if all(span.end <= k.start or span.start >= k.end for k in kept):
+            kept.append(span)
+    return sorted(kept, key=lambda s: s.start)
+
+
+def detect_pii(text: str, kinds=None, min_confidence: float = 0.0) -> list:
+    """
+    Run the detectors for ``kinds`` (all of them by default) and return
+    non-overlapping ``PIISpan``s in text order.
+    """
+    if not text:
+        return []
+    spans = []
+    for kind in kinds or DETECTORS:
+        spans.extend(DETECTORS[kind](text))
+    return [s for s in _resolve_overlaps(spans) if s.confidence >= min_confidence]
+
+
+def has_personal_info(text: str, kinds=PII_KINDS, min_confidence: float = PII_MIN_CONFIDENCE) -> bool:
+    return bool(detect_pii(text, kinds, min_confidence))
+
+
+def find_values(text: str, kind: str, min_confidence: float = PII_MIN_CONFIDENCE) -> list:
+    """Distinct matched strings of one kind, e.g. the phones in a post."""
+    return list(dict.fromkeys(s.text for s in detect_pii(text, (kind,), min_confidence)))
@@ -0,0 +1,204 @@
+# backend/insights/recommendations.py
+
+import os
+import json
+import logging
+import threading
+
+import xxhash
+from openai import OpenAI
+
+from insights.analysis_cache import TwoTierCache
+from insights.metrics import INSIGHT_TYPES, METRIC_TITLES, SENTIMENTS
+
+logger = logging.getLogger(__name__)
+
+OPENAI_MODEL = os.getenv("OPENAI_RECOMMENDATION_MODEL", "gpt-4o-mini")
+OPENAI_TIMEOUT = float(os.getenv("OPENAI_TIMEOUT", "60"))
+MAX_TOKENS = 500
+SAMPLE_POSTS = 5
+# Bump when the prompt changes so old cached answers stop matching
+PROMPT_VERSION = 2
+
+# Near-identical metric profiles share one completion. Scores are
+# rounded to RECOMMENDATION_BUCKET points; 0 TTL turns the cache off.
+RECOMMENDATION_BUCKET = int(os.getenv("RECOMMENDATION_BUCKET", "10"))
+RECOMMENDATION_CACHE_TTL = int(os.getenv("RECOMMENDATION_CACHE_TTL", str(7 * 24 * 3600)))
+RECOMMENDATION_COLLECTION = os.getenv("RECOMMENDATION_CACHE_COLLECTION", "recommendation_cache")
+RECOMMENDATION_MEMORY_BYTES = int(os.getenv("RECOMMENDATION_CACHE_MEMORY_BYTES", str(4 * 1024 * 1024)))
+
+recommendation_cache = TwoTierCache(RECOMMENDATION_COLLECTION, RECOMMENDATION_CACHE_TTL, RECOMMENDATION_MEMORY_BYTES)
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def get_openai_client() -> OpenAI:
+    """One pooled OpenAI client per process, created on first use."""
+    pid = os.getpid()
+    client = _clients.get(pid)
+    if client is None:
+        with _clients_lock:
+            client = _clients.get(pid)
+            if client is None:
+                client = OpenAI(api_key=os.getenv("OPENAI_API_KEY_2"), timeout=OPENAI_TIMEOUT)
+                _clients[pid] = client
+    return client
+
+
+def _bucket(value) -> int:
+    try:
+        value = min(max(float(value), 0), 100)
+        return int(round(value / RECOMMENDATION_BUCKET) * RECOMMENDATION_BUCKET)
+    except (TypeError, ValueError):
+        return -1
+
+
+def prompt_inputs(insights, insightMetrics) -> tuple:
+    """
+    Everything the prompt is built from: bucketed metric scores and the
+    labels and flags of the sample posts, never their text. Cached
+    answers are shared between users with the same inputs, so nothing
+    that identifies a user may go in here. Only known metric titles,
+    insight types and labels get through; no caller-supplied free text
+    reaches the prompt or the cache key.
+    """
+    profile = sorted(
+        (m["title"], _bucket(m.get("value")))
+        for m in insightMetrics or []
+        if m.get("title") in METRIC_TITLES
+    )
+    samples = [
+        item for item in insights
+        if item.get("translated") and item["translated"].strip()
+        and str(item.get("type", "")).lower() in INSIGHT_TYPES
+    ]
+    signature = sorted(
+        (_features(item) for item in samples[:SAMPLE_POSTS]),
+        key=lambda features: json.dumps(features, sort_keys=True),
+    )
+    return profile, signature
+
+
+def _features(item: dict) -> dict:
+    label = str(item.get("label") or "").lower()
+    return {
+        "type": str(item["type"]).lower(),
+        "sentiment": label if label in SENTIMENTS else "neutral",
+        "respectful": bool(item.get("is_respectful")),
+        "mentions_location": bool(item.get("mentions_location")),
+        "shares_personal_info": bool(item.get("privacy_disclosure")),
+    }
+
+
+def build_prompt(insights, insightMetrics) -> str:
+    profile, signature = prompt_inputs(insights, insightMetrics)
+    metrics = [{"title": title, "value": value} for title, value in profile]
+
+    return f"""
+You are a friendly AI assistant analyzing social media behavior.
+
+Write the response in clear, well-structured sections using markdown.
+
+Rules:
+- Start with a short introductory paragraph.
+- Use markdown headings (###) for each section.
+- Each section should be 3–4 sentences.
+- Use a friendly, supportive, and professional tone.
+- Do NOT use emojis.
+- Do NOT write everything in one paragraph.
+
+User insight metrics (percentages, rounded):
+{json.dumps(metrics, indent=2)}
+
+What a few of the user's analyzed posts show (the posts themselves are not included):
+{json.dumps(signature, indent=2) if signature else "The user has only a few short posts."}
+
+Sections to include (use these exact titles):
+### Positive Engagement and Content
+### Posting Habits and Consistency
+### Privacy and Personal Information
+### Respectful Communication
+### Overall Recommendations
+"""
+
+
+# -----------------------------
+# Cache
+# -----------------------------
+def recommendation_key(insights, insightMetrics) -> str:
+    """The prompt depends on nothing else, so equal keys mean equal prompts."""
+    profile, signature = prompt_inputs(insights, insightMetrics)
+    fingerprint = json.dumps(
+        [OPENAI_MODEL, PROMPT_VERSION, RECOMMENDATION_BUCKET, profile, signature], sort_keys=True
+    )
+    return xxhash.xxh3_128_hexdigest(fingerprint.encode("utf-8"))
+
+
+def _cached(key: str):
+    return recommendation_cache.get(key) if RECOMMENDATION_CACHE_TTL > 0 else None
+
+
+def _store(key: str, text: str):
+    if text and RECOMMENDATION_CACHE_TTL > 0:
+        recommendation_cache.set(key, text)
+
+
+def recommendation_cache_stats() -> dict:
+    return {"bucket": RECOMMENDATION_BUCKET, **recommendation_cache.stats()}
+
+
+# -----------------------------
+# Generation
+# -----------------------------
+def _request(prompt: str, stream: bool):
+    return get_openai_client().chat.completions.create(
+        model=OPENAI_MODEL,
+        messages=[{"role": "user", "content": prompt}],
+        temperature=0.7,
+        max_tokens=MAX_TOKENS,
+        stream=stream,
+    )
+
+
+def generate_recommendations(insights, insightMetrics) -> str:
+    """
+    Markdown recommendations for the given metrics and sample insights,
+    "" on failure. Answers for a matching fingerprint come from the cache.
+    """
+    key = recommendation_key(insights, insightMetrics)
+    cached = _cached(key)
+    if cached is not None:
+        return cached
+
+    try:
+        response = _request(build_prompt(insights, insightMetrics), stream=False)
+        text = response.choices[0].message.content.strip()
+    except Exception as e:
+        logger.error(f"[OPENAI ERROR] {e}")
+        return ""
+    _store(key, text)
+    return text
+
+
+def stream_recommendations(insights, insightMetrics):
+    """
+    Yield the recommendation text piece by piece as the model writes it.
+    A cached answer comes back as a single piece.
+    """
+    key = recommendation_key(insights, insightMetrics)
+    cached = _cached(key)
+    if cached is not None:
+        yield cached
+        return
+
+    parts = []
+    try:
+        for chunk in _request(build_prompt(insights, insightMetrics), stream=True):
+            if chunk.choices and chunk.choices[0].delta.content:
+                parts.append(chunk.choices[0].delta.content)
+                yield parts[-1]
+    except Exception as e:
+        logger.error(f"[OPENAI STREAM ERROR] {e}")
+        return
+    _store(key, "".join(parts).strip())
@@ -1,68 +1,55 @@
 # backend/insights/report_service.py
-import time
 import requests
 import logging
 
-from insights.services import (
-    analyze_text,
-    is_respectful,
-    mentions_location,
-    discloses_personal_info,
-    is_toxic,
-    is_potential_misinformation,
-    compute_insight_metrics
-)
+from insights.services import analyze_many, compute_metrics
+from insights.graph_fetch import iter_posts_sync
+from insights import http_transport
 
 logger = logging.getLogger(__name__)
-REQUEST_DELAY = 0.3
+PROGRESS_EVERY = 10
 
 
-def analyze_facebook_data(token, method="ml", max_posts=5):
-    insights = []
-    fetched_posts = 0
-
-    fb_posts_url = (
-        f"https://graph.facebook.com/v19.0/me/posts?"
-        f"fields=message,story,status_type,created_time,object_id"
-        f"&limit=5&access_token={token}"
-    )
-
-    while fb_posts_url and fetched_posts < max_posts:
-        res = requests.get(fb_posts_url, timeout=20)
-        if res.status_code != 200:
-            raise Exception("Facebook API failed")
-
-        data = res.json()
-
-        for post in data.get("data", []):
-            if fetched_posts >= max_posts:
-                break
+def analyze_facebook_data(token, method="ml", max_posts=5, on_progress=None,
+                          since=None, with_metrics=True):
+    """
+    Fetch and analyze up to ``max_posts`` posts, only those newer than
+    ``since`` (unix time) when given. ``on_progress`` is called with the
+    current stage and counters every PROGRESS_EVERY posts.
+    """
+    progress = on_progress or (lambda **kwargs: None)
 
-            text = post.get("message") or post.get("story") or ""
-            analysis = analyze_text(text, method)
-
-            analysis.update({
-                "timestamp": post.get("created_time"),
-                "is_respectful": is_respectful(text),
-                "mentions_location": mentions_location(text),
-                "privacy_disclosure": discloses_personal_info(text),
-                "toxic": is_toxic(text),
-                "misinformation_risk": is_potential_misinformation(text),
-                "type": "post"
-            })
-
-            insights.append(analysis)
-            fetched_posts += 1
-            time.sleep(REQUEST_DELAY)
-
-        fb_posts_url = data.get("paging", {}).get("next")
-
-    metrics, recommendations = compute_insight_metrics(insights)
+    progress(stage="fetching", posts_fetched=0, posts_analyzed=0)
+    fetched = []
+    for item in iter_posts_sync(token, max_posts, resolve_shared=False, strict=True, since=since):
+        fetched.append(item)
+        if len(fetched) % PROGRESS_EVERY == 0:
+            progress(stage="fetching", posts_fetched=len(fetched), posts_analyzed=0)
 
+    insights = []
+    progress(stage="analyzing", posts_fetched=len(fetched), posts_analyzed=0)
+    for start in range(0, len(fetched), PROGRESS_EVERY):
+        chunk = fetched[start:start + PROGRESS_EVERY]
+        for item, result in zip(chunk, analyze_many([i["content"] for i in chunk], method)):
+            insights.append(result.as_insight(
+                post_id=item["post"].get("id"),
+                timestamp=item["post"].get("created_time"),
+                updated_time=item["post"].get("updated_time"),
+                type="post",
+            ))
+        progress(stage="analyzing", posts_fetched=len(fetched), posts_analyzed=len(insights))
+
+    if not with_metrics:
+        return {"insights": insights}
+
+    progress(stage="computing_metrics", posts_fetched=len(fetched), posts_analyzed=len(insights))
+    accumulator = compute_metrics(insights)
+
+    # Recommendations are generated afterwards by their own task
     return {
         "insights": insights,
-        "insightMetrics": metrics,
-        "recommendations": recommendations
+        "insightMetrics": accumulator.metrics(),
+        "metricsState": accumulator.to_dict(),
     }
 
 def fetch_profile(token):
@@ -72,7 +59,7 @@ def fetch_profile(token):
         f"&access_token={token}"
     )
     try:
-        res = requests.get(url, timeout=10)
+        res = http_transport.get(url)
     except requests.exceptions.RequestException as e:
         logger.error(f"Facebook API unreachable: {e}")
         return None
@@ -0,0 +1,210 @@
+# backend/insights/report_store.py
+
+import os
+import json
+import zlib
+import base64
+import logging
+from datetime import datetime
+
+from bson import Binary, ObjectId
+from bson.errors import InvalidId
+from pymongo import ASCENDING, DESCENDING
+from pymongo.errors import OperationFailure
+
+from .mongo_client import db, reports_collection
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+# Insights per compressed page in report_insights
+INSIGHT_PAGE_SIZE = int(os.getenv("REPORT_INSIGHT_PAGE_SIZE", "50"))
+
+# Report documents hold the header (status, metrics, recommendations,
+# summary counts); the insights live here as zlib-compressed JSON pages.
+# Each save writes a new generation and the header's summary names the
+# one readers see, so a report never shows half of two saves.
+report_insights_collection = db["report_insights"]
+
+# What the reports list shows; insights and metrics state stay in Mongo
+SUMMARY_PROJECTION = {
+    "report_id": 1,
+    "profile_id": 1,
+    "status": 1,
+    "error": 1,
+    "recommendations_status": 1,
+    "insightMetrics": 1,
+    "new_posts": 1,
+    "summary": 1,
+    "created_at": 1,
+    "updated_at": 1,
+    "completed_at": 1,
+}
+
+_indexes_ready = False
+
+
+def ensure_indexes():
+    """
+    Unique ``report_id`` for lookups, and ``(profile_id, created_at)``
+    for the list, walked forwards or backwards. ``_id`` breaks ties between reports
+    created in the same millisecond so the cursor order is total.
+    Insight pages are unique per ``(report_id, generation, page)``.
+    """
+    global _indexes_ready
+    if _indexes_ready:
+        return
+    reports_collection.create_index([("report_id", ASCENDING)], unique=True)
+    reports_collection.create_index(
+        [("profile_id", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)]
+    )
+    # Pages were unique per report before generations; that index would
+    # reject the next generation's pages
+    try:
+        report_insights_collection.drop_index("report_id_1_page_1")
+    except OperationFailure:
+        pass
+    report_insights_collection.create_index(
+        [("report_id", ASCENDING), ("generation", ASCENDING), ("page", ASCENDING)], unique=True
+    )
+    _indexes_ready = True
+
+
+# -----------------------------
+# Cursors
+# -----------------------------
+def encode_cursor(report: dict) -> str:
+    created_at = report["created_at"]
+    payload = json.dumps([created_at.isoformat(), str(report["_id"])])
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> tuple:
+    """``(created_at, _id)`` of the last report on the previous page."""
+    try:
+        created_at, oid = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return datetime.fromisoformat(created_at), ObjectId(oid)
+    except (ValueError, TypeError, InvalidId) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
+# -----------------------------
+# Queries
+# -----------------------------
+def list_reports(profile_id: str, limit: int = DEFAULT_PAGE_SIZE, after: str = None,
+                 order: str = "desc") -> tuple:
+    """
+    One page of report summaries for ``profile_id``, newest first, or
+    oldest first when ``order`` is "asc". Returns ``(reports,
+    next_cursor)``; ``next_cursor`` is None on the last page. Pages are
+    keyset-based, so the cost does not grow with how far back the
+    client has paged.
+    """
+    if order not in ("asc", "desc"):
+        raise ValueError(f"Invalid order: {order}")
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    direction, past = (ASCENDING, "$gt") if order == "asc" else (DESCENDING, "$lt")
+    query = {"profile_id": profile_id}
+    if after:
+        created_at, oid = decode_cursor(after)
+        query["$or"] = [
+            {"created_at": {past: created_at}},
+            {"created_at": created_at, "_id": {past: oid}},
+        ]
+
+    # One extra row tells whether another page exists
+    reports = list(
+        reports_collection
+        .find(query, SUMMARY_PROJECTION)
+        .sort([("created_at", direction), ("_id", direction)])
+        .limit(limit + 1)
+    )
+    next_cursor = encode_cursor(reports[limit - 1]) if len(reports) > limit else None
+    reports = reports[:limit]
+
+    for r in reports:
+        r["_id"] = str(r["_id"])
+    return reports, next_cursor
+
+
+# -----------------------------
+# Insight Pages
+# -----------------------------
+def _compact(item: dict) -> dict:
+    """Drop ``translated`` when it only repeats ``original``."""
+    if item.get("translated") is not None and item.get("translated") == item.get("original"):
+        item = dict(item)
+        del item["translated"]
+    return item
+
+
+def _expand(item: dict) -> dict:
+    if "translated" not in item and "original" in item:
+        item["translated"] = item["original"]
+    return item
+
+
+def _pack(items: list) -> Binary:
+    payload = json.dumps([_compact(i) for i in items], separators=(",", ":"), default=str)
+    return Binary(zlib.compress(payload.encode("utf-8"), 6))
+
+
+def _unpack(data: bytes) -> list:
+    return [_expand(i) for i in json.loads(zlib.decompress(data))]
+
+
+def save_insights(report_id: str, insights: list) -> dict:
+    """
+    Store ``insights`` as a new generation of compressed pages of
+    INSIGHT_PAGE_SIZE items. Earlier generations stay readable until the
+    returned summary is on the report header and prune_insights runs.
+    """
+    ensure_indexes()
+    generation = str(ObjectId())
+    pages = [insights[i:i + INSIGHT_PAGE_SIZE] for i in range(0, len(insights), INSIGHT_PAGE_SIZE)]
+    if pages:
+        report_insights_collection.insert_many([
+            {"report_id": report_id, "generation": generation, "page": n, "count": len(items),
+             "data": _pack(items)}
+            for n, items in enumerate(pages)
+        ])
+
+    types = [str(i.get("type", "")).lower() for i in insights]
+    return {
+        "insights": len(insights),
+        "posts": types.count("post"),
+        "comments": types.count("comment"),
+        "insight_pages": len(pages),
+        "insight_page_size": INSIGHT_PAGE_SIZE,
+        "insight_generation": generation,
+    }
+
+
+def prune_insights(report_id: str, generation: str) -> int:
+    """Delete the pages of every generation of ``report_id`` but ``generation``."""
+    result = report_insights_collection.delete_many(
+        {"report_id": report_id, "generation": {"$ne": generation}}
+    )
+    return result.deleted_count
+
+
+def load_insights(report: dict, page: int = None) -> list:
+    """
+    Insights of ``report`` (a header document): one page, or all of
+    them when ``page`` is None. Reports written before the split still
+    carry an embedded ``insights`` list, which is paged the same way.
+    """
+    if "summary" not in report:
+        projection = {"insights": 1}
+        if page is not None:
+            projection = {"insights": {"$slice": [page * INSIGHT_PAGE_SIZE, INSIGHT_PAGE_SIZE]}}
+        legacy = reports_collection.find_one({"report_id": report["report_id"]}, projection) or {}
+        return legacy.get("insights") or []
+
+    # Pages saved before generations have none; None matches them
+    query = {"report_id": report["report_id"], "generation": report["summary"].get("insight_generation")}
+    if page is not None:
+        query["page"] = page
+    docs = report_insights_collection.find(query, {"data": 1}).sort("page", ASCENDING)
+    return [item for doc in docs for item in _unpack(doc["data"])]
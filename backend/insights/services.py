@@ -3,26 +3,30 @@ import logging
 import os
 import random
 from datetime import datetime
-import json
-import requests
+from dataclasses import dataclass, field
 from dotenv import load_dotenv
 
 import numpy as np
-import pytz
-from dateutil import parser
 from langdetect import detect
 from emoji import demojize, EMOJI_DATA
 
-from openai import OpenAI
-
-from insights.gradio_models import analyze_text_gradio
+from insights import http_transport, lexicon, translation
+from insights.inference import run_inference_many
+from insights.metrics import MetricsAccumulator
+from insights.metrics_columnar import accumulate_columnar
+from insights.recommendations import generate_recommendations
+from insights.pii import detect_pii, has_personal_info, PII_KINDS, PII_MIN_CONFIDENCE
 
 load_dotenv()
 
 # print(os.getenv("HUGGINGFACE_TOKEN"))
 # print(os.getenv("OPENAI_API_KEY_2"))
 logger = logging.getLogger(__name__)
-LOCAL_TZ = pytz.timezone("Asia/Colombo")
+COLUMNAR_THRESHOLD = 200
+# "translate": translate non-English text, then run the English models.
+# "multilingual": non-English sentiment comes from the multilingual
+# classifier and "translated" stays None until fill_translations.
+ANALYSIS_MODE = os.getenv("ANALYSIS_MODE", "translate")
 
 
 # TEXT NORMALIZATION
@@ -33,7 +37,8 @@ def remove_variation_selectors(text: str) -> str:
 
 
 def is_emoji_only(text: str) -> bool:
-    stripped = text.strip()
+    # Variation selectors and joiners are not in EMOJI_DATA on their own
+    stripped = remove_variation_selectors(text).replace("\u200d", "").strip()
     return bool(stripped) and all(
         ch in EMOJI_DATA or ch.isspace() for ch in stripped
     )
@@ -42,50 +47,170 @@ def is_emoji_only(text: str) -> bool:
 
 # CORE NLP ANALYSIS
 
-def analyze_text(text: str, method="ml") -> dict:
-    if not text or not text.strip():
-        return {
-            "original": text,
-            "translated": text,
-            "label": "neutral",
+@dataclass(frozen=True)
+class TextAnalysis:
+    """Result of a single model call; every flag helper reads from this."""
+    text: str
+    # English text the models saw; None when it was not translated
+    translated: str = None
+    language: str = translation.TARGET_LANGUAGE
+    label: str = "neutral"
+    toxic: bool = False
+    misinformation: bool = False
+    entities: list = field(default_factory=list)
+    phones: list = field(default_factory=list)
+    emails: list = field(default_factory=list)
+    personal_info: list = field(default_factory=list)
+    # Set when the backend failed for this text; the flags are then unknown
+    error: str = None
+
+    @classmethod
+    def from_result(cls, text: str, result: dict, translated: str = None,
+                    language: str = translation.TARGET_LANGUAGE) -> "TextAnalysis":
+        # Personal info is detected locally; the model's phones/emails are not used
+        spans = detect_pii(text, PII_KINDS, PII_MIN_CONFIDENCE)
+        entities = result.get("entities") or []
+        toxic = bool(result.get("toxic", False))
+        if not result.get("error"):
+            # The lexicons know local slurs and place names the models miss
+            toxic = toxic or any(lexicon.toxic_terms.contains(t) for t in {text, translated} if t)
+            if not any(ent.get("entity") == "LOCATION" for ent in entities):
+                place = lexicon.places.first(text)
+                if place:
+                    entities = entities + [{"entity": "LOCATION", "word": place}]
+        return cls(
+            text=text,
+            translated=translated,
+            language=language,
+            label=result.get("label", "neutral"),
+            error=result.get("error"),
+            toxic=toxic,
+            misinformation=bool(result.get("misinformation", False)),
+            entities=entities,
+            phones=list(dict.fromkeys(s.text for s in spans if s.kind == "phone")),
+            emails=list(dict.fromkeys(s.text for s in spans if s.kind == "email")),
+            personal_info=spans,
+        )
+
+    @property
+    def location(self):
+        for ent in self.entities:
+            if ent.get("entity") == "LOCATION":
+                return ent.get("word")
+        return None
+
+    @property
+    def is_respectful(self) -> bool:
+        return not self.toxic
+
+    @property
+    def discloses_personal_info(self) -> bool:
+        return bool(self.personal_info)
+
+    def as_insight(self, **extra) -> dict:
+        """Flatten into the insight dict shape stored in reports."""
+        insight = {
+            "original": self.text,
+            "translated": self.text if self.language == translation.TARGET_LANGUAGE else self.translated,
+            "label": self.label,
+            "is_respectful": self.is_respectful,
+            "mentions_location": self.location,
+            "privacy_disclosure": self.discloses_personal_info,
+            "toxic": self.toxic,
+            "misinformation_risk": self.misinformation,
         }
+        if self.language != translation.TARGET_LANGUAGE:
+            insight["language"] = self.language
+        if self.error:
+            insight["error"] = self.error
+        insight.update(extra)
+        return insight
+
+
+def analyze(text: str, method="ml") -> TextAnalysis:
+    """
+    Run the model once for ``text`` and return the typed result.
+    ``method`` picks the inference backend ("gradio", "local", or "ml"
+    for the configured default).
+    """
+    if not text or not text.strip():
+        return TextAnalysis(text=text)
+
+    return analyze_many([text], method)[0]
+
+
+def analyze_many(texts: list, method="ml", mode=None) -> list:
+    """
+    Like ``analyze`` for several texts, sharing batched model requests.
+    Languages are detected first. In "translate" mode (ANALYSIS_MODE)
+    non-English texts are translated in batches and the models see the
+    English; in "multilingual" mode they are sent as written and their
+    sentiment comes from the multilingual classifier.
+    """
+    mode = mode or ANALYSIS_MODE
+    languages = [
+        translation.detect_language(text) if text and text.strip() else translation.TARGET_LANGUAGE
+        for text in texts
+    ]
+    if mode == "multilingual":
+        translated = [None] * len(texts)
+        model_texts = texts
+    else:
+        translated = translation.translate_many(texts, languages)
+        model_texts = translated
+
+    results = run_inference_many(model_texts, method)
+    if mode == "multilingual":
+        _multilingual_sentiment(texts, languages, results)
+
+    return [
+        TextAnalysis.from_result(text, result, translated=english, language=language)
+        if text and text.strip()
+        else TextAnalysis(text=text)
+        for text, result, english, language in zip(texts, results, translated, languages)
+    ]
 
-    result = analyze_text_gradio(text)
 
-    return {
-        "original": text,
-        "translated": text,
-        "label": result.get("label", "neutral"),
-    }
+def _multilingual_sentiment(texts: list, languages: list, results: list):
+    """Replace the English model's label on non-English texts, in place."""
+    from insights.hf_models import multilingual_sentiment_labels
+
+    foreign = [
+        i for i, (text, language) in enumerate(zip(texts, languages))
+        if language != translation.TARGET_LANGUAGE and not results[i].get("error")
+    ]
+    labels = multilingual_sentiment_labels([texts[i] for i in foreign]) if foreign else None
+    for i, label in zip(foreign, labels or []):
+        results[i] = {**results[i], "label": label}
+
+
+def analyze_text(text: str, method="ml") -> dict:
+    result = analyze(text, method).as_insight()
+    return {key: result.get(key) for key in ("original", "translated", "label")}
 
 
 # LOCATION DETECTION
 
 def mentions_location(text: str):
-    result = analyze_text_gradio(text)
-    for ent in result.get("entities", []):
-        if ent.get("entity") == "LOCATION":
-            return ent.get("word")
-    return None
+    return analyze(text).location
 
 
 
 # TOXICITY (Updated for API)
 
 def is_toxic(text: str) -> bool:
-    result = analyze_text_gradio(text)
-    return bool(result.get("toxic", False))
+    return analyze(text).toxic
 
 
 def is_respectful(text: str) -> bool:
-    return not is_toxic(text)
+    return analyze(text).is_respectful
 
 
 
 # PRIVACY
 def discloses_personal_info(text: str) -> bool:
-    result = analyze_text_gradio(text)
-    return bool(result.get("phones") or result.get("emails"))
+    # Local detectors only, no model call
+    return has_personal_info(text)
 
 
 
@@ -93,162 +218,41 @@ def discloses_personal_info(text: str) -> bool:
 # MISINFORMATION (Updated for API)
 
 def is_potential_misinformation(text: str) -> bool:
-    result = analyze_text_gradio(text)
-    return bool(result.get("misinformation", False))
+    return analyze(text).misinformation
 
 
 
 # METRICS & RECOMMENDATIONS
 def generate_ai_recommendations_openai(insights, insightMetrics):
-    client = OpenAI(api_key=os.getenv("OPENAI_API_KEY_2"))
- 
-    filtered_insights = [
-        item for item in insights
-        if item.get("translated") and item["translated"].strip()
-    ] or [{"translated": "User has a few short posts."}]
- 
-    prompt = f"""
-You are a friendly AI assistant analyzing social media behavior.
-
-Write the response in clear, well-structured sections using markdown.
-
-Rules:
-- Start with a short introductory paragraph.
-- Use markdown headings (###) for each section.
-- Each section should be 3–4 sentences.
-- Use a friendly, supportive, and professional tone.
-- Do NOT use emojis.
-- Do NOT write everything in one paragraph.
-
-User insight metrics:
-{json.dumps(insightMetrics, indent=2)}
-
-Sample analyzed posts:
-{json.dumps(filtered_insights[:5], indent=2)}
-
-Sections to include (use these exact titles):
-### Positive Engagement and Content
-### Posting Habits and Consistency
-### Privacy and Personal Information
-### Respectful Communication
-### Overall Recommendations
-"""
-
- 
-    try:
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",  
-            messages=[
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.7,
-            max_tokens=500,
-        )
- 
-        text = response.choices[0].message.content.strip()
-        return text
-    except Exception as e:
-        logger.error(f"[OPENAI ERROR] {e}")
-        return ""
-      
-def compute_insight_metrics(insights: list):
-    posts = [
-        i for i in insights
-        if str(i.get("type", "")).lower() == "post"
-    ]
-    total_posts = len(posts)
-    total_items = max(len(insights), 1)
-
-    sentiment_counts = {"positive": 0, "negative": 0, "neutral": 0}
-    night_posts = 0
-    location_mentions = 0
-    respectful_count = 0
-
-    
-    # Sentiment & behavior (ALL)
-    
-    for item in insights:
-        label = (item.get("label") or "").lower()
-        if label in sentiment_counts:
-            sentiment_counts[label] += 1
-
-        if item.get("mentions_location"):
-            location_mentions += 1
-
-        if item.get("is_respectful"):
-            respectful_count += 1
-
-    
-    # Posting habits (POSTS ONLY)
-    
-    for post in posts:
-        ts = (
-            post.get("timestamp")
-            or post.get("time")
-            or post.get("created_time")
+    """Blocking recommendation call; see insights.recommendations for streaming."""
+    return generate_recommendations(insights, insightMetrics)
+
+
+def compute_metrics(insights) -> MetricsAccumulator:
+    """
+    Fold insights into a MetricsAccumulator without calling OpenAI.
+    Large histories take the vectorized NumPy path.
+    """
+    if len(insights) >= COLUMNAR_THRESHOLD:
+        return accumulate_columnar(insights)
+    return MetricsAccumulator.from_insights(insights)
+
+
+def compute_insight_metrics(insights: list, with_recommendations=True):
+    """
+    ``(metrics, recommendations)``. With ``with_recommendations=False``
+    OpenAI is skipped and recommendations come back as "" so the caller
+    can generate them separately.
+    """
+    accumulator = compute_metrics(insights)
+    insightMetrics = accumulator.metrics()
+
+    recommendations = ""
+    if with_recommendations:
+        recommendations = generate_ai_recommendations_openai(
+            accumulator.samples,
+            insightMetrics
         )
-        if not ts:
-            continue
-
-        try:
-            dt = parser.parse(ts) 
-            if dt.tzinfo is None:
-                dt = dt.replace(tzinfo=pytz.UTC)
-
-            local_dt = dt.astimezone(LOCAL_TZ)
-
-            if local_dt.hour >= 23 or local_dt.hour < 6:
-                night_posts += 1
-
-        except Exception as e:
-            logger.warning(f"Timestamp parse failed: {ts} | {e}")
-        
-    # Metric Calculations
-    
-
-    happy_posts_score = round(
-        (sentiment_counts["positive"] / total_items) * 100
-    )
-
-    if total_posts == 0:
-        good_posting_habits_score = 100
-    else:
-        late_ratio = night_posts / total_posts
-
-        if late_ratio == 0:
-            good_posting_habits_score = 100
-        elif late_ratio <= 0.2:
-            good_posting_habits_score = 80
-        elif late_ratio <= 0.4:
-            good_posting_habits_score = 60
-        elif late_ratio <= 0.6:
-            good_posting_habits_score = 40
-        else:
-            good_posting_habits_score = 20
-
-    logger.info(
-        f"Posting habits debug → total_posts={total_posts}, night_posts={night_posts}"
-    )
-
-    privacy_care_score = round(
-        100 - (location_mentions / total_items) * 100
-    )
-
-    respectful_score = round(
-        (respectful_count / total_items) * 100
-    )
-
-    insightMetrics = [
-        {"title": "Happy Posts", "value": happy_posts_score},
-        {"title": "Good Posting Habits", "value": good_posting_habits_score},
-        {"title": "Privacy Care", "value": privacy_care_score},
-        {"title": "Being Respectful", "value": respectful_score},
-    ]
-
-    recommendations = generate_ai_recommendations_openai(
-        insights,
-        insightMetrics
-    )
 
     return insightMetrics, recommendations
 
@@ -259,5 +263,5 @@ def fetch_profile(token):
         f"fields=id,name,birthday,gender,picture.width(200).height(200)"
         f"&access_token={token}"
     )
-    res = requests.get(url, timeout=10)
+    res = http_transport.get(url)
     return res.json() if res.status_code == 200 else None
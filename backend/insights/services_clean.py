@@ -4,16 +4,22 @@ import os
 import random
 from datetime import datetime
 import json
-import requests
 import pytz
-from langdetect import detect, LangDetectException
 from emoji import demojize, EMOJI_DATA
 from openai import OpenAI
 from insights import hf_models as insight_models
+from insights import http_transport
+from insights import lexicon
+from insights import translation
+from insights.pii import has_personal_info
 from insights.hf_models import map_sentiment_label
 print(os.getenv("HUGGINGFACE_TOKEN"))
 logger = logging.getLogger(__name__)
 LOCAL_TZ = pytz.timezone("Asia/Colombo")
+# "translate": translate non-English text, then use the English models.
+# "multilingual": send non-English text straight to a multilingual
+# classifier and leave "translated" empty until fill_translations.
+ANALYSIS_MODE = os.getenv("ANALYSIS_MODE", "translate")
 def remove_variation_selectors(text: str) -> str:
     """Remove emoji variation selectors (U+FE0F)."""
     return text.replace("\ufe0f", "")
@@ -22,52 +28,19 @@ def is_emoji_only(text: str) -> bool:
     return bool(stripped) and all(
         ch in EMOJI_DATA or ch.isspace() for ch in stripped
     )
-def analyze_text(text: str, method="ml") -> dict:
-    """
-    Safe sentiment analysis with:
-    - emoji handling
-    - lazy translation
-    - fail-safe ML execution
-    """
-    if not text or not text.strip():
-        return {
-            "original": text,
-            "translated": text,
-            "label": "neutral",
-        }
-    original_text = text.strip()
-    clean_text = remove_variation_selectors(original_text)
-    if is_emoji_only(clean_text):
-        positive_emojis = {"😍", "🥰", "❤️", "😂", "😊", "👍"}
-        negative_emojis = {"😢", "💔", "😠", "😡", "😞"}
-        if any(e in clean_text for e in positive_emojis):
-            label = "positive"
-        elif any(e in clean_text for e in negative_emojis):
-            label = "negative"
-        else:
-            label = "neutral"
-        return {
-            "original": original_text,
-            "translated": original_text,
-            "label": label,
-        }
-    processed_text = demojize(clean_text)
-    processed_text = processed_text.replace(":", " ").replace("_", " ")
-    try:
-        lang = detect(processed_text)
-    except LangDetectException:
-        lang = "en"
-    translated_text = processed_text
-    if lang != "en":
-        try:
-            from googletrans import Translator
-            translator = Translator()
-            translated_text = translator.translate(
-                processed_text, dest="en"
-            ).text
-        except Exception as e:
-            logger.warning(f"[TRANSLATION FAILED] {e}")
-            translated_text = processed_text
+def preprocess_text(text: str) -> str:
+    """Text as the models see it: emoji spelled out as words."""
+    processed_text = demojize(remove_variation_selectors(text.strip()))
+    return processed_text.replace(":", " ").replace("_", " ")
+def emoji_only_label(clean_text: str) -> str:
+    positive_emojis = {"😍", "🥰", "❤️", "😂", "😊", "👍"}
+    negative_emojis = {"😢", "💔", "😠", "😡", "😞"}
+    if any(e in clean_text for e in positive_emojis):
+        return "positive"
+    elif any(e in clean_text for e in negative_emojis):
+        return "negative"
+    return "neutral"
+def sentiment_label(translated_text: str, method="ml") -> str:
     label = "neutral"
     if method == "ml":
         sentiment_predictor = insight_models.get_sentiment_model()
@@ -77,16 +50,64 @@ def analyze_text(text: str, method="ml") -> dict:
                 if pred and isinstance(pred, list):
                     data = pred[0][0] if isinstance(pred[0], list) else pred[0]
                     raw_label = data.get("label", "")
-                    score = float(data.get("score", 0))
-                    mapped = map_sentiment_label(raw_label)
-                    label = mapped if score >= 0.5 else mapped
+                    label = map_sentiment_label(raw_label)
             except Exception as e:
                 logger.error(f"[SENTIMENT ERROR] {e}")
-    return {
-        "original": original_text,
-        "translated": translated_text,
-        "label": label,
-    }
+    return label
+def multilingual_sentiment_labels(texts: list, method="ml") -> list:
+    labels = None
+    if method == "ml":
+        labels = insight_models.multilingual_sentiment_labels(texts)
+    return labels or ["neutral"] * len(texts)
+def analyze_texts(texts: list, method="ml", mode=None) -> list:
+    """
+    Safe sentiment analysis for many texts with:
+    - emoji handling
+    - cached language detection
+    - batched translation grouped by language, or multilingual routing
+    - fail-safe ML execution
+    """
+    mode = mode or ANALYSIS_MODE
+    results = [None] * len(texts)
+    pending = []
+    for i, text in enumerate(texts):
+        if not text or not text.strip():
+            results[i] = {"original": text, "translated": text, "label": "neutral"}
+            continue
+        original_text = text.strip()
+        clean_text = remove_variation_selectors(original_text)
+        if is_emoji_only(clean_text):
+            results[i] = {
+                "original": original_text,
+                "translated": original_text,
+                "label": emoji_only_label(clean_text),
+            }
+            continue
+        pending.append((i, original_text, preprocess_text(original_text)))
+    if mode == "multilingual":
+        routed = [(entry, translation.detect_language(entry[2])) for entry in pending]
+        foreign = [(entry, lang) for entry, lang in routed if lang != translation.TARGET_LANGUAGE]
+        labels = multilingual_sentiment_labels([entry[2] for entry, _ in foreign], method)
+        for ((i, original_text, _), lang), label in zip(foreign, labels):
+            results[i] = {
+                "original": original_text,
+                "translated": None,
+                "language": lang,
+                "label": label,
+            }
+        pending = [entry for entry, lang in routed if lang == translation.TARGET_LANGUAGE]
+        translated = [processed for _, _, processed in pending]
+    else:
+        translated = translation.translate_many([processed for _, _, processed in pending])
+    for (i, original_text, _), translated_text in zip(pending, translated):
+        results[i] = {
+            "original": original_text,
+            "translated": translated_text,
+            "label": sentiment_label(translated_text, method),
+        }
+    return results
+def analyze_text(text: str, method="ml") -> dict:
+    return analyze_texts([text], method)[0]
 def mentions_location(text: str):
     if not text:
         return None
@@ -97,24 +118,11 @@ def mentions_location(text: str):
             return locations[0]
     except Exception as e:
         logger.warning(f"[NER ERROR] {e}")
-    fallback_cities = [
-        "colombo", "kandy", "galle", "jaffna", "batticaloa",
-        "trincomalee", "negombo", "kurunegala", "anuradhapura",
-        "ratnapura", "badulla", "matara",
-    ]
-    lowered = text.lower()
-    for city in fallback_cities:
-        if city in lowered:
-            return city.capitalize()
-    return None
+    return lexicon.places.first(text)
 def is_toxic(text: str) -> bool:
     if not text:
         return False
-    toxic_keywords = {
-        "shit", "fuck", "bitch", "asshole", "bastard"
-    }
-    lowered = text.lower()
-    keyword_match = any(word in lowered for word in toxic_keywords)
+    keyword_match = lexicon.toxic_terms.contains(text)
     toxic_predictor = insight_models.get_toxic_model()
     model_prediction = False
     if toxic_predictor:
@@ -132,14 +140,7 @@ def is_respectful(text: str) -> bool:
 def discloses_personal_info(text: str) -> bool:
     if not text:
         return False
-    try:
-        entities = insight_models.extract_entities(text)
-        return bool(
-            entities.get("phones") or entities.get("emails")
-        )
-    except Exception as e:
-        logger.warning(f"[PRIVACY CHECK ERROR] {e}")
-        return False
+    return has_personal_info(text)
 def is_potential_misinformation(text: str) -> bool:
     if not text or not text.strip():
         return False
@@ -234,5 +235,5 @@ def fetch_profile(token):
         f"fields=id,name,birthday,gender,picture.width(200).height(200)"
         f"&access_token={token}"
     )
-    res = requests.get(url, timeout=10)
+    res = http_transport.get(url)
     return res.json() if res.status_code == 200 else None
@@ -0,0 +1,80 @@
+# backend/insights/sidecar_models.py
+
+import os
+import logging
+import threading
+
+import httpx
+
+from insights.inference import empty_result, error_result
+
+logger = logging.getLogger(__name__)
+
+SIDECAR_SOCKET = os.getenv("INFERENCE_SIDECAR_SOCKET", "/tmp/insights-inference.sock")
+# e.g. http://127.0.0.1:8765; when set it is used instead of the socket
+SIDECAR_URL = os.getenv("INFERENCE_SIDECAR_URL", "")
+SIDECAR_TIMEOUT = float(os.getenv("INFERENCE_SIDECAR_TIMEOUT", "60"))
+SIDECAR_CHUNK = int(os.getenv("SIDECAR_MAX_TEXTS", "512"))
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def get_sidecar_client() -> httpx.Client:
+    """Keep-alive client to the inference server, one per process."""
+    pid = os.getpid()
+    client = _clients.get(pid)
+    if client is None:
+        with _clients_lock:
+            client = _clients.get(pid)
+            if client is None:
+                if SIDECAR_URL:
+                    client = httpx.Client(base_url=SIDECAR_URL, timeout=SIDECAR_TIMEOUT)
+                else:
+                    client = httpx.Client(
+                        base_url="http://inference",
+                        transport=httpx.HTTPTransport(uds=SIDECAR_SOCKET),
+                        timeout=SIDECAR_TIMEOUT,
+                    )
+                _clients[pid] = client
+    return client
+
+
+def analyze_texts_sidecar(texts: list) -> list:
+    """
+    Same schema as ``analyze_texts_gradio``, served by inference_server.
+    Texts the sidecar did not answer for (down, HTTP error, malformed
+    reply) come back as ``error_result("unavailable")``.
+    """
+    pending = list(dict.fromkeys(t for t in texts if t and t.strip()))
+    resolved = {}
+    try:
+        for start in range(0, len(pending), SIDECAR_CHUNK):
+            chunk = pending[start:start + SIDECAR_CHUNK]
+            response = get_sidecar_client().post("/analyze", json={"texts": chunk})
+            response.raise_for_status()
+            results = response.json()["results"]
+            if len(results) != len(chunk):
+                raise ValueError(f"{len(results)} results for {len(chunk)} texts")
+            resolved.update((text, r) for text, r in zip(chunk, results) if isinstance(r, dict))
+    except (httpx.HTTPError, KeyError, TypeError, ValueError) as e:
+        logger.error(f"[SIDECAR ERROR] {e}")
+    return [
+        (resolved.get(text) or error_result("unavailable")) if text and text.strip() else empty_result()
+        for text in texts
+    ]
+
+
+def analyze_text_sidecar(text: str) -> dict:
+    if not text or not text.strip():
+        return empty_result()
+    return analyze_texts_sidecar([text])[0]
+
+
+def sidecar_health() -> dict:
+    try:
+        response = get_sidecar_client().get("/health", timeout=5)
+        response.raise_for_status()
+        return response.json()
+    except httpx.HTTPError as e:
+        return {"status": "unavailable", "error": str(e)}
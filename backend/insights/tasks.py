@@ -1,47 +1,190 @@
 from celery import shared_task
-from datetime import datetime
+from datetime import datetime, timedelta
 import logging
+import os
 
 from .mongo_client import reports_collection
 from .report_service import analyze_facebook_data, fetch_profile
+from .services import compute_metrics
+from .recommendations import generate_recommendations
+from .report_store import prune_insights, save_insights
+from .insight_store import (
+    save_post_insights,
+    load_post_insights,
+    count_post_insights,
+    prune_post_insights,
+    since_timestamp,
+    newest_post_time,
+)
 
 logger = logging.getLogger(__name__)
 
+# A "since" fetch never sees edits to older posts or deletions, so an
+# incremental profile is re-fetched in full this often
+INCREMENTAL_FULL_REFRESH_HOURS = float(os.getenv("INCREMENTAL_FULL_REFRESH_HOURS", "24"))
+
+
+def new_report_document(report_id, user_id=None, max_posts=5):
+    return {
+        "report_id": report_id,
+        "user_id": str(user_id) if user_id else None,
+        "profile_id": None,
+        "status": "pending",
+        "max_posts": max_posts,
+        "progress": {"stage": "queued", "posts_fetched": 0, "posts_analyzed": 0},
+        "created_at": datetime.utcnow(),
+        "updated_at": datetime.utcnow(),
+    }
+
+
+def update_progress(report_id, stage, posts_fetched=0, posts_analyzed=0):
+    reports_collection.update_one(
+        {"report_id": report_id},
+        {"$set": {
+            "progress": {
+                "stage": stage,
+                "posts_fetched": posts_fetched,
+                "posts_analyzed": posts_analyzed,
+            },
+            "updated_at": datetime.utcnow(),
+        }}
+    )
+
+
+def last_incremental_report(profile_id, method):
+    """The profile's last completed incremental report for ``method``."""
+    return reports_collection.find_one(
+        {
+            "profile_id": profile_id,
+            "method": method,
+            "status": "completed",
+            "since_cursor": {"$ne": None},
+        },
+        {"since_cursor": 1, "full_refresh_at": 1},
+        sort=[("created_at", -1)],
+    )
+
+
+def needs_full_fetch(previous, profile_id, method, max_posts):
+    if not previous or not previous.get("full_refresh_at"):
+        return True
+    if datetime.utcnow() - previous["full_refresh_at"] > timedelta(hours=INCREMENTAL_FULL_REFRESH_HOURS):
+        return True
+    # The store cannot fill a larger report than the ones that built it
+    return count_post_insights(profile_id, method) < max_posts
+
+
+def analyze_incremental(report_id, token, profile_id, method, max_posts, on_progress):
+    """
+    Fetch only posts newer than the last report, upsert their analyses
+    into the per-post store, and build the report from the stored
+    analyses plus that delta. Periodically, and whenever the store
+    holds fewer than ``max_posts`` posts, the newest ``max_posts`` are
+    fetched in full instead: edited posts are then re-analyzed and
+    deleted ones are pruned from the store.
+    """
+    previous = last_incremental_report(profile_id, method)
+    full = needs_full_fetch(previous, profile_id, method, max_posts)
+    cursor = None if full else previous["since_cursor"]
+    since = since_timestamp(cursor)
+    delta = analyze_facebook_data(
+        token,
+        method,
+        max_posts,
+        on_progress=on_progress,
+        since=since + 1 if since else None,
+        with_metrics=False,
+    )["insights"]
+
+    logger.info(
+        f"Incremental report | report_id={report_id} full={full} since={cursor} new_posts={len(delta)}"
+    )
+    save_post_insights(profile_id, method, delta)
+    if full:
+        pruned = prune_post_insights(profile_id, method, delta)
+        if pruned:
+            logger.info(f"Pruned {pruned} deleted posts | profile_id={profile_id} method={method}")
+
+    insights = load_post_insights(profile_id, method, max_posts) or delta
+    on_progress(stage="computing_metrics", posts_fetched=len(delta), posts_analyzed=len(insights))
+    accumulator = compute_metrics(insights)
+
+    return {
+        "insights": insights,
+        "insightMetrics": accumulator.metrics(),
+        "metricsState": accumulator.to_dict(),
+        "since_cursor": newest_post_time(insights) or cursor,
+        "full_refresh_at": datetime.utcnow() if full else previous["full_refresh_at"],
+        "new_posts": len(delta),
+    }
+
 
 @shared_task(bind=True)
-def generate_report(self, report_id, token, method="ml", max_posts=5, user_id=None):
+def generate_report(self, report_id, token, method="ml", max_posts=5, user_id=None, incremental=True):
 
     logger.info(f"📝 Creating report | report_id={report_id}")
 
     try:
-        result = reports_collection.insert_one({
-            "report_id": report_id,
-            "user_id": str(user_id) if user_id else None,
-            "profile_id": None,
-            "status": "processing",
-            "created_at": datetime.utcnow()
-        })
+        # The view normally creates the pending document before dispatch;
+        # upsert so the task also works when called on its own.
+        reports_collection.update_one(
+            {"report_id": report_id},
+            {
+                "$setOnInsert": {
+                    "user_id": str(user_id) if user_id else None,
+                    "profile_id": None,
+                    "max_posts": max_posts,
+                    "created_at": datetime.utcnow(),
+                },
+                "$set": {"status": "processing", "task_id": self.request.id},
+            },
+            upsert=True,
+        )
+        update_progress(report_id, "fetching_profile")
 
-        logger.info(f"✅ DB INSERT SUCCESS | _id={result.inserted_id}")
+        logger.info(f"✅ Report processing | report_id={report_id}")
 
         profile = fetch_profile(token)
-        analysis = analyze_facebook_data(token, method, max_posts)
+        profile_id = profile.get("id") if profile else None
+        on_progress = lambda **progress: update_progress(report_id, **progress)
+
+        if incremental and profile_id:
+            analysis = analyze_incremental(report_id, token, profile_id, method, max_posts, on_progress)
+        else:
+            analysis = analyze_facebook_data(token, method, max_posts, on_progress=on_progress)
+
+        # Insights go to report_insights; the report keeps only counts
+        summary = save_insights(report_id, analysis["insights"])
 
         reports_collection.update_one(
             {"report_id": report_id},
             {"$set": {
                 "status": "completed",
                 "completed_at": datetime.utcnow(),
+                "updated_at": datetime.utcnow(),
+                "progress.stage": "completed",
                 "profile": profile,
-                "profile_id": profile.get("id") if profile else None,
-                "insights": analysis["insights"],
+                "profile_id": profile_id,
+                "summary": summary,
                 "insightMetrics": analysis["insightMetrics"],
-                "recommendations": analysis["recommendations"]
+                "recommendations": "",
+                "recommendations_status": "pending",
+                "metricsState": analysis.get("metricsState"),
+                "method": method,
+                "since_cursor": analysis.get("since_cursor"),
+                "full_refresh_at": analysis.get("full_refresh_at"),
+                "new_posts": analysis.get("new_posts"),
             }}
         )
 
+        # Older generations are unreachable once the header points past them
+        prune_insights(report_id, summary["insight_generation"])
+
         logger.info(f"✅ Report completed | report_id={report_id}")
 
+        # Metrics are visible now; the LLM call runs as its own task
+        dispatch_recommendations(report_id)
+
     except Exception as e:
         logger.exception("Report generation failed")
 
@@ -50,7 +193,58 @@ def generate_report(self, report_id, token, method="ml", max_posts=5, user_id=No
             {"$set": {
                 "status": "failed",
                 "error": str(e),
-                "failed_at": datetime.utcnow()
+                "failed_at": datetime.utcnow(),
+                "updated_at": datetime.utcnow(),
+                "progress.stage": "failed",
             }}
         )
 
+
+def dispatch_recommendations(report_id):
+    """
+    Queue the recommendation task, or run it inline if the queue is
+    down. Failures here only affect recommendations_status; the report
+    itself is already complete.
+    """
+    try:
+        generate_report_recommendations.delay(report_id)
+        return
+    except Exception as e:
+        logger.error(f"[CELERY ERROR] Recommendation dispatch failed, running inline: {e}")
+
+    try:
+        generate_report_recommendations(report_id)
+    except Exception:
+        logger.exception(f"Recommendations failed | report_id={report_id}")
+        try:
+            reports_collection.update_one(
+                {"report_id": report_id},
+                {"$set": {"recommendations_status": "failed", "updated_at": datetime.utcnow()}}
+            )
+        except Exception as e:
+            logger.error(f"[MONGO ERROR] {e}")
+
+
+@shared_task
+def generate_report_recommendations(report_id):
+    """Fill a completed report's recommendations from its stored metrics."""
+    report = reports_collection.find_one(
+        {"report_id": report_id},
+        {"insightMetrics": 1, "metricsState.samples": 1},
+    )
+    if not report:
+        logger.warning(f"Recommendations skipped, report not found | report_id={report_id}")
+        return
+
+    samples = (report.get("metricsState") or {}).get("samples") or []
+    recommendations = generate_recommendations(samples, report.get("insightMetrics") or [])
+
+    reports_collection.update_one(
+        {"report_id": report_id},
+        {"$set": {
+            "recommendations": recommendations,
+            "recommendations_status": "completed" if recommendations else "failed",
+            "updated_at": datetime.utcnow(),
+        }}
+    )
+    logger.info(f"✅ Recommendations ready | report_id={report_id}")
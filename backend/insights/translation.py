@@ -0,0 +1,230 @@
+# backend/insights/translation.py
+
+import os
+import asyncio
+import logging
+import threading
+
+from langdetect import DetectorFactory, LangDetectException, detect_langs
+
+from insights.analysis_cache import SizedLRU, TwoTierCache, cache_key, normalize_text
+
+logger = logging.getLogger(__name__)
+
+# langdetect is random unless seeded
+DetectorFactory.seed = 0
+
+TARGET_LANGUAGE = "en"
+TRANSLATION_VERSION = "googletrans-4.0.2:v1"
+TRANSLATION_TTL_SECONDS = int(os.getenv("TRANSLATION_CACHE_TTL", str(30 * 24 * 3600)))
+TRANSLATION_COLLECTION = os.getenv("TRANSLATION_CACHE_COLLECTION", "translation_cache")
+TRANSLATION_MEMORY_BYTES = int(os.getenv("TRANSLATION_CACHE_MEMORY_BYTES", str(16 * 1024 * 1024)))
+# Per request to the translation service
+TRANSLATE_CHUNK_CHARS = int(os.getenv("TRANSLATE_CHUNK_CHARS", "4000"))
+TRANSLATE_CHUNK_ITEMS = int(os.getenv("TRANSLATE_CHUNK_ITEMS", "50"))
+TRANSLATE_TIMEOUT = 30
+# langdetect guesses wildly on short Latin-script text ("good day" -> so);
+# below this many letters, or under this probability, assume English
+LANGDETECT_MIN_LETTERS = int(os.getenv("LANGDETECT_MIN_LETTERS", "20"))
+LANGDETECT_MIN_PROB = float(os.getenv("LANGDETECT_MIN_PROB", "0.8"))
+
+# Unicode blocks that identify a language without any statistics
+SCRIPT_RANGES = (
+    ("si", 0x0D80, 0x0DFF),  # Sinhala
+    ("ta", 0x0B80, 0x0BFF),  # Tamil
+    ("hi", 0x0900, 0x097F),  # Devanagari
+    ("ar", 0x0600, 0x06FF),  # Arabic
+)
+
+translation_cache = TwoTierCache(TRANSLATION_COLLECTION, TRANSLATION_TTL_SECONDS, TRANSLATION_MEMORY_BYTES)
+_languages = SizedLRU(4 * 1024 * 1024)
+
+
+# -----------------------------
+# Language Detection
+# -----------------------------
+def _script_language(text: str):
+    counts = {}
+    for ch in text:
+        cp = ord(ch)
+        if cp < 0x0600:
+            continue
+        for lang, lo, hi in SCRIPT_RANGES:
+            if lo <= cp <= hi:
+                counts[lang] = counts.get(lang, 0) + 1
+                break
+    return max(counts, key=counts.get) if counts else None
+
+
+def _statistical_language(text: str) -> str:
+    if sum(ch.isalpha() for ch in text) < LANGDETECT_MIN_LETTERS:
+        return TARGET_LANGUAGE
+    try:
+        best = detect_langs(text)[0]
+    except (LangDetectException, IndexError):
+        return TARGET_LANGUAGE
+    return best.lang if best.prob >= LANGDETECT_MIN_PROB else TARGET_LANGUAGE
+
+
+def detect_language(text: str) -> str:
+    """
+    ISO code of ``text``'s language, "en" when unknown. Sinhala, Tamil
+    and a few other scripts are recognised from their Unicode block;
+    everything else goes to a seeded langdetect. Results are cached.
+    """
+    if not text or not text.strip():
+        return TARGET_LANGUAGE
+
+    key = cache_key(text, "lang")
+    lang = _languages.get(key)
+    if lang is None:
+        lang = _script_language(text) or _statistical_language(text)
+        _languages.set(key, lang)
+    return lang
+
+
+# -----------------------------
+# Shared Translator
+# -----------------------------
+class _TranslatorLoop:
+    """
+    googletrans 4 is async; one Translator (and its connection pool)
+    lives on a private event loop thread per process and every caller
+    submits work to it.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pid = None
+        self._loop = None
+        self._translator = None
+
+    def _ensure_started(self):
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._loop = asyncio.new_event_loop()
+            threading.Thread(target=self._loop.run_forever, name="translator", daemon=True).start()
+            self._translator = None
+            self._pid = os.getpid()
+
+    async def _translate(self, texts, src):
+        if self._translator is None:
+            from googletrans import Translator
+
+            self._translator = Translator(raise_exception=True)
+        return await self._translator.translate(texts, dest=TARGET_LANGUAGE, src=src)
+
+    def translate(self, texts, src: str):
+        self._ensure_started()
+        future = asyncio.run_coroutine_threadsafe(self._translate(texts, src), self._loop)
+        return future.result(timeout=TRANSLATE_TIMEOUT)
+
+
+_translator = _TranslatorLoop()
+
+
+def _chunks(texts: list) -> list:
+    chunks, current, size = [], [], 0
+    for text in texts:
+        if current and (size + len(text) > TRANSLATE_CHUNK_CHARS or len(current) >= TRANSLATE_CHUNK_ITEMS):
+            chunks.append(current)
+            current, size = [], 0
+        current.append(text)
+        size += len(text) + 1
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def _translate_chunk(texts: list, src: str) -> list:
+    """
+    Translate ``texts`` in one request by joining them with newlines.
+    If the reply does not split back into the same number of lines the
+    texts are sent as a list instead (one request each, concurrently).
+    """
+    if len(texts) > 1:
+        translated = _translator.translate("\n".join(texts), src).text.split("\n")
+        if len(translated) == len(texts):
+            return [t.strip() for t in translated]
+        logger.warning(f"[TRANSLATION] Joined batch split mismatch for {src}, retrying per text")
+    return [t.text for t in _translator.translate(list(texts), src)]
+
+
+# -----------------------------
+# Translation
+# -----------------------------
+def _translation_key(text: str, lang: str) -> str:
+    return cache_key(text, f"{TRANSLATION_VERSION}:{lang}")
+
+
+def translate_many(texts: list, languages: list = None) -> list:
+    """
+    English versions of ``texts``, in order. English and empty texts are
+    returned unchanged; the rest are looked up in the translation cache,
+    and misses are grouped by language into batched requests. A text
+    whose translation fails comes back untranslated.
+    """
+    languages = languages or [detect_language(t) for t in texts]
+    results = list(texts)
+
+    pending = {}
+    for i, (text, lang) in enumerate(zip(texts, languages)):
+        if text and text.strip() and lang != TARGET_LANGUAGE:
+            pending.setdefault((lang, normalize_text(text)), []).append(i)
+    if not pending:
+        return results
+
+    keys = {item: _translation_key(item[1], item[0]) for item in pending}
+    cached = translation_cache.get_many(list(keys.values()))
+
+    by_language = {}
+    for item, indices in pending.items():
+        hit = cached.get(keys[item])
+        if hit is not None:
+            for i in indices:
+                results[i] = hit
+        else:
+            by_language.setdefault(item[0], []).append(item[1])
+
+    for lang, sources in by_language.items():
+        for chunk in _chunks(sources):
+            try:
+                translated = _translate_chunk(chunk, lang)
+            except Exception as e:
+                logger.warning(f"[TRANSLATION FAILED] {lang}: {e}")
+                continue
+            for source, english in zip(chunk, translated):
+                if not english:
+                    continue
+                translation_cache.set(keys[(lang, source)], english)
+                for i in pending[(lang, source)]:
+                    results[i] = english
+    return results
+
+
+def translate(text: str) -> str:
+    return translate_many([text])[0]
+
+
+def translation_stats() -> dict:
+    return translation_cache.stats()
+
+
+def fill_translations(items: list) -> list:
+    """
+    Fill ``translated`` on insight dicts that were analyzed without
+    translation (``translated`` is None), in one batched pass. Items
+    without a ``language`` are detected first.
+    """
+    missing = [item for item in items if item.get("translated") is None and item.get("original")]
+    if missing:
+        translated = translate_many(
+            [item["original"] for item in missing],
+            [item.get("language") or detect_language(item["original"]) for item in missing],
+        )
+        for item, text in zip(missing, translated):
+            item["translated"] = text
+    return items
@@ -3,8 +3,15 @@ from . import views
 
 urlpatterns = [
     path('analyze/', views.analyze_facebook),
+    path('analyze/stream/', views.analyze_facebook_stream, name="analyze_stream"),
+    path("recommendations/stream/", views.recommendations_stream, name="recommendations_stream"),
     path("request-report/", views.request_report, name="request_report"),
     path("reports/", views.get_reports, name="get_reports"),
     path("reports/<str:report_id>/", views.get_report, name="get_report"),
+    path("reports/<str:report_id>/status/", views.get_report_status, name="get_report_status"),
+    path("cache-stats/", views.analysis_cache_stats, name="analysis_cache_stats"),
+    path("cascade-stats/", views.cascade_stats, name="cascade_stats"),
+    path("recommendation-cache-stats/", views.recommendation_cache_stats, name="recommendation_cache_stats"),
+    path("health/mongo/", views.mongo_health, name="mongo_health"),
     path('robots.txt', views.robots_txt),
 ]
@@ -1,36 +1,39 @@
-import time
 import requests
 import logging
 from django.http import JsonResponse
-from concurrent.futures import ThreadPoolExecutor, as_completed
 
 import uuid
 import json
-from django.http import HttpResponse
+import hashlib
+from datetime import timezone
+from django.utils.http import http_date
+from django.http import HttpResponse, StreamingHttpResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.contrib.auth.decorators import login_required
+from django.contrib.admin.views.decorators import staff_member_required
 from .mongo_client import reports_collection
+from .report_store import DEFAULT_PAGE_SIZE, list_reports, load_insights
 
 from insights.services import (
-    analyze_text,
-    is_respectful,
-    mentions_location,
-    discloses_personal_info,
-    is_toxic,
-    is_potential_misinformation,
-    compute_insight_metrics
+    TextAnalysis,
+    analyze_many,
+    compute_insight_metrics,
 )
+from insights.recommendations import stream_recommendations
+from insights.metrics import INSIGHT_TYPES, METRIC_TITLES, MetricsAccumulator
+from insights.graph_fetch import fetch_posts_sync, iter_posts_sync
+from insights import http_transport
 
 
 
 
-MAX_THREADS = 5
-REQUEST_DELAY = 0.3
 DEFAULT_MAX_POSTS = 5
 MAX_COMMENTS = 5
 MAX_POSTS_LIMIT = 5
 MAX_COMMENTS_LIMIT = 5
 MAX_NESTED = 5
+# Only a few samples reach the prompt; the rest is not needed
+MAX_RECOMMENDATION_INSIGHTS = 200
 
 def robots_txt(request):
     lines = [
@@ -47,13 +50,13 @@ logger = logging.getLogger(__name__)
 # Helper functions
 
 def safe_request(url: str) -> dict:
-    time.sleep(REQUEST_DELAY)
+    res = None
     try:
-        res = requests.get(url)
+        res = http_transport.get(url)
         res.raise_for_status()
         return res.json()
     except requests.exceptions.HTTPError as e:
-        if res.status_code == 400:
+        if res is not None and res.status_code == 400:
             return {}
         logger.error(f"HTTP error: {url} -> {e}")
     except Exception as e:
@@ -87,6 +90,29 @@ def fetch_nested_comments(comment: dict, token: str) -> list:
     return nested_comments
 
 
+def analyze_fetched_post(item: dict, method: str) -> list:
+    """Analyze a fetched post and its comments in one batched model call."""
+    post, comments = item["post"], item["comments"]
+    texts = [item["content"]] + [c.get("message", "") for c in comments]
+    try:
+        results = [a.as_insight() for a in analyze_many(texts, method)]
+    except Exception as e:
+        logger.warning(f"ML Analysis failed: {e}")
+        results = [TextAnalysis(text=t).as_insight() for t in texts]
+
+    results[0].update({
+        "timestamp": post.get("created_time"),
+        "status_type": post.get("status_type"),
+        "type": "post"
+    })
+    for c, c_analysis in zip(comments, results[1:]):
+        c_analysis.update({
+            "timestamp": c.get("created_time"),
+            "type": "comment"
+        })
+    return results
+
+
 # CORS SAFE JSON RESPONSE HELPER
 
 def cors_json_response(data, status=200):
@@ -100,6 +126,49 @@ def cors_json_response(data, status=200):
     return response
 
 
+def cors_stream_response(events, content_type):
+    response = StreamingHttpResponse(events, content_type=content_type)
+    response["Access-Control-Allow-Origin"] = "http://localhost:3000"
+    response["Access-Control-Allow-Credentials"] = "true"
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+
+def extract_token(request):
+    token = None
+    auth_header = request.headers.get("Authorization")
+
+    if auth_header and auth_header.startswith("Bearer "):
+        token = auth_header.split(" ", 1)[1]
+
+    # Fallbacks
+    return token or request.GET.get("token") or request.COOKIES.get("fb_token")
+
+
+def fetch_verified_profile(token: str):
+    """Fetch the profile, returning (profile, None) or (None, error response)."""
+    profile_url = (
+        f"https://graph.facebook.com/v19.0/me?"
+        f"fields=id,name,birthday,gender,picture.width(200).height(200)"
+        f"&access_token={token}"
+    )
+    try:
+        profile_res = http_transport.get(profile_url)
+    except requests.exceptions.RequestException as e:
+        logger.error(f"Facebook connection failed: {e}")
+        return None, JsonResponse({
+            "error": "Facebook API unreachable",
+            "details": "Backend cannot connect to Facebook right now. Please retry."
+        }, status=503)
+
+    if profile_res.status_code != 200:
+        logger.error(f"FB API Error: {profile_res.text}")
+        return None, cors_json_response({"error": "Facebook rejected token or it expired"}, status=401)
+
+    return profile_res.json(), None
+
+
 # Main View
 
 @csrf_exempt
@@ -113,14 +182,7 @@ def analyze_facebook(request):
 
     try:
         # 2. Flexible Token Extraction (Fixes the 401 issue)
-        token = None
-        auth_header = request.headers.get("Authorization")
-        
-        if auth_header and auth_header.startswith("Bearer "):
-            token = auth_header.split(" ", 1)[1]
-        
-        # Fallbacks
-        token = token or request.GET.get("token") or request.COOKIES.get("fb_token")
+        token = extract_token(request)
 
         if not token:
             logger.error("401 Trace: No token found in headers, params, or cookies")
@@ -130,116 +192,29 @@ def analyze_facebook(request):
         max_posts = min(int(request.GET.get("max_posts", 10)), MAX_POSTS_LIMIT)
 
         # 3. Fetch Profile (Verify Token with FB)
-        profile_url = (
-            f"https://graph.facebook.com/v19.0/me?"
-            f"fields=id,name,birthday,gender,picture.width(200).height(200)"
-            f"&access_token={token}"
-        )
-        try:
-            profile_res = requests.get(profile_url, timeout=10)
-        except requests.exceptions.RequestException as e:
-            logger.error(f"Facebook connection failed: {e}")
-            return JsonResponse({
-                "error": "Facebook API unreachable",
-                "details": "Backend cannot connect to Facebook right now. Please retry."
-            }, status=503)
-
-        
-        if profile_res.status_code != 200:
-            logger.error(f"FB API Error: {profile_res.text}")
-            return cors_json_response({"error": "Facebook rejected token or it expired"}, status=401)
-        
-        profile_data = profile_res.json()
-
-        # 4. Fetch Posts & Sequential Analysis
+        profile_data, error_response = fetch_verified_profile(token)
+        if error_response:
+            return error_response
+
+        # 4. Fetch Posts, Comments & Shared Stories concurrently
+        fetched = fetch_posts_sync(token, max_posts, max_comments=MAX_COMMENTS_LIMIT)
+
+        # 5. Analyze each post together with its comments
         insights = []
-        shared_cache = {}
-        fetched_posts = 0
-        
-        fb_posts_url = (
-            f"https://graph.facebook.com/v19.0/me/posts?"
-            f"fields=message,story,status_type,created_time,object_id&limit=5&access_token={token}"
-        )
+        for item in fetched:
+            insights.extend(analyze_fetched_post(item, method))
 
-        while fb_posts_url and fetched_posts < max_posts:
-            res = requests.get(fb_posts_url, timeout=30)
-            if res.status_code != 200: break
-            
-            data = res.json()
-            posts = data.get("data", [])
-
-            for post in posts:
-                if fetched_posts >= max_posts: break
-                
-                content = post.get("message") or post.get("story") or ""
-                
-                # Handle shared stories
-                if post.get("status_type") == "shared_story":
-                    shared_id = post.get("object_id")
-                    if shared_id and shared_id not in shared_cache:
-                        shared_data = requests.get(
-                            f"https://graph.facebook.com/v19.0/{shared_id}?fields=message&access_token={token}",
-                            timeout=5
-                        ).json()
-                        shared_cache[shared_id] = shared_data.get("message", "")
-                    content = shared_cache.get(shared_id, content)
-
-                # ML Analysis (Post)
-                try:
-                    analysis = analyze_text(content, method)
-                except Exception as e:
-                    logger.warning(f"ML Analysis failed: {e}")
-                    analysis = {"original": content, "label": "neutral"}
-
-                analysis.update({
-                    "timestamp": post.get("created_time"),
-                    "is_respectful": is_respectful(content),
-                    "mentions_location": mentions_location(content),
-                    "privacy_disclosure": discloses_personal_info(content),
-                    "toxic": is_toxic(content),
-                    "misinformation_risk": is_potential_misinformation(content),
-                    "status_type": post.get("status_type"),
-                    "type": "post"
-                })
-                insights.append(analysis)
-
-                # 5. Fetch & Analyze Comments (Sequential to avoid OOM crash)
-                comment_url = (
-                    f"https://graph.facebook.com/v19.0/{post['id']}/comments?"
-                    f"fields=message,created_time&limit={MAX_COMMENTS_LIMIT}&access_token={token}"
-                )
-                c_res = requests.get(comment_url, timeout=20)
-                if c_res.status_code == 200:
-                    for c in c_res.json().get("data", []):
-                        c_text = c.get("message", "")
-                        try:
-                            c_analysis = analyze_text(c_text, method)
-                        except:
-                            c_analysis = {"original": c_text, "label": "neutral"}
-                        
-                        c_analysis.update({
-                            "timestamp": c.get("created_time"),
-                            "is_respectful": is_respectful(c_text),
-                            "mentions_location": mentions_location(c_text),
-                            "privacy_disclosure": discloses_personal_info(c_text),
-                            "toxic": is_toxic(c_text),
-                            "type": "comment"
-                        })
-                        insights.append(c_analysis)
-                
-                fetched_posts += 1
-                time.sleep(REQUEST_DELAY)
-
-            fb_posts_url = data.get("paging", {}).get("next") if fetched_posts < max_posts else None
-
-        # 6. Final Calculations
-        insight_metrics, recommendations = compute_insight_metrics(insights)
+        # 6. Final Calculations. Recommendations come from
+        # recommendations/stream/ unless the caller asks for them inline.
+        inline = request.GET.get("recommendations") == "inline"
+        insight_metrics, recommendations = compute_insight_metrics(insights, with_recommendations=inline)
 
         return cors_json_response({
             "profile": profile_data,
             "insights": insights,
             "insightMetrics": insight_metrics,
-            "recommendations": recommendations
+            "recommendations": recommendations,
+            "recommendationsPending": not inline,
         })
 
     except Exception as e:
@@ -249,9 +224,149 @@ def analyze_facebook(request):
             "details": str(e)
         }, status=500)
 
+def _format_event(event: str, data, sse: bool) -> str:
+    payload = json.dumps(data, default=str)
+    if sse:
+        return f"event: {event}\ndata: {payload}\n\n"
+    return json.dumps({"event": event, "data": data}, default=str) + "\n"
+
+
+def stream_analysis_events(token, profile, method, max_posts, sse=False):
+    """
+    Yield the profile, then every post/comment insight as soon as it is
+    analyzed, then the metrics, then the recommendation text as it is
+    generated.
+    """
+    yield _format_event("profile", profile, sse)
+
+    # Only running counters are kept, so memory stays flat per request.
+    accumulator = MetricsAccumulator()
+    try:
+        for item in iter_posts_sync(token, max_posts, max_comments=MAX_COMMENTS_LIMIT):
+            for insight in analyze_fetched_post(item, method):
+                accumulator.add(insight)
+                yield _format_event("insight", insight, sse)
+
+        insight_metrics = accumulator.metrics()
+        yield _format_event("metrics", {
+            "insightMetrics": insight_metrics,
+            "recommendations": "",
+        }, sse)
+        yield from recommendation_events(accumulator.samples, insight_metrics, sse)
+    except Exception as e:
+        logger.error(f"STREAM CRASH: {str(e)}")
+        yield _format_event("error", {"error": "Internal Server Error", "details": str(e)}, sse)
+
+    yield _format_event("done", {"count": accumulator.items}, sse)
+
+
+def recommendation_events(samples, insight_metrics, sse=False):
+    """A "recommendation" event per generated chunk, then the full text."""
+    parts = []
+    for delta in stream_recommendations(samples, insight_metrics):
+        parts.append(delta)
+        yield _format_event("recommendation", {"delta": delta}, sse)
+    yield _format_event("recommendations", {"recommendations": "".join(parts).strip()}, sse)
+
+
+@csrf_exempt
+def recommendations_stream(request):
+    """
+    Stream recommendations for metrics the client already has, e.g.
+    from ``analyze/``. Body: {"insightMetrics": [...], "insights": [...]}.
+    Needs the same Facebook token as ``analyze/``; only the known metric
+    titles and insight types are accepted.
+    """
+    if request.method == "OPTIONS":
+        return cors_json_response({})
+
+    if request.method != "POST":
+        return cors_json_response({"error": "Method not allowed"}, status=405)
+
+    token = extract_token(request)
+    if not token:
+        return cors_json_response({"error": "Authorization token missing"}, status=401)
+
+    try:
+        data = json.loads(request.body or "{}")
+    except ValueError:
+        return cors_json_response({"error": "Invalid JSON"}, status=400)
+
+    insight_metrics = data.get("insightMetrics")
+    insights = data.get("insights") or []
+    error = validate_recommendation_input(insight_metrics, insights)
+    if error:
+        return cors_json_response({"error": error}, status=400)
+
+    _, error_response = fetch_verified_profile(token)
+    if error_response:
+        return error_response
+
+    samples = MetricsAccumulator.from_insights(insights).samples
+
+    sse = (
+        request.GET.get("format") == "sse"
+        or "text/event-stream" in request.headers.get("Accept", "")
+    )
+    content_type = "text/event-stream" if sse else "application/x-ndjson"
+    return cors_stream_response(recommendation_events(samples, insight_metrics, sse), content_type)
+
+
+def validate_recommendation_input(insight_metrics, insights):
+    """An error message for a malformed recommendations body, or None."""
+    if not isinstance(insight_metrics, list) or not insight_metrics:
+        return "insightMetrics is required"
+    for metric in insight_metrics:
+        if not isinstance(metric, dict) or metric.get("title") not in METRIC_TITLES:
+            return "Unknown metric title"
+        value = metric.get("value")
+        if isinstance(value, bool) or not isinstance(value, (int, float)) or not 0 <= value <= 100:
+            return "Metric values must be percentages"
+    if not isinstance(insights, list) or len(insights) > MAX_RECOMMENDATION_INSIGHTS:
+        return f"insights must be a list of at most {MAX_RECOMMENDATION_INSIGHTS} items"
+    for item in insights:
+        if not isinstance(item, dict) or str(item.get("type", "")).lower() not in INSIGHT_TYPES:
+            return "Unknown insight type"
+    return None
+
+
+@csrf_exempt
+def analyze_facebook_stream(request):
+    """
+    Streaming variant of ``analyze_facebook``. Emits NDJSON by default,
+    or Server-Sent Events when the client accepts text/event-stream or
+    passes ``format=sse``.
+    """
+    if request.method == "OPTIONS":
+        return cors_json_response({})
+
+    if request.method != "GET":
+        return cors_json_response({"error": "Method not allowed"}, status=405)
+
+    token = extract_token(request)
+    if not token:
+        return cors_json_response({"error": "Authorization token missing"}, status=401)
+
+    method = request.GET.get("method", "ml")
+    max_posts = min(int(request.GET.get("max_posts", 10)), MAX_POSTS_LIMIT)
+
+    profile_data, error_response = fetch_verified_profile(token)
+    if error_response:
+        return error_response
+
+    sse = (
+        request.GET.get("format") == "sse"
+        or "text/event-stream" in request.headers.get("Accept", "")
+    )
+    content_type = "text/event-stream" if sse else "application/x-ndjson"
+    return cors_stream_response(
+        stream_analysis_events(token, profile_data, method, max_posts, sse=sse),
+        content_type,
+    )
+
 @csrf_exempt
 def request_report(request):
-    from .tasks import generate_report
+    from .tasks import generate_report, new_report_document
 
     logger.info("/insights/request-report CALLED")
 
@@ -267,25 +382,41 @@ def request_report(request):
     token = data.get("token")
     method = data.get("method", "ml")
     max_posts = int(data.get("max_posts", 5))
+    incremental = str(data.get("incremental", True)).lower() not in ("0", "false", "no", "off")
 
     if not token:
         return JsonResponse({"error": "Token required"}, status=400)
 
     report_id = str(uuid.uuid4())
 
-    # NOW THIS IS SAFE
-    logger.info(f"Starting report generation | report_id={report_id}")
+    logger.info(f"Queueing report generation | report_id={report_id}")
+
+    # Create the pending document first so the status endpoint can
+    # answer as soon as the client starts polling.
+    try:
+        reports_collection.insert_one(new_report_document(report_id, max_posts=max_posts))
+    except Exception as e:
+        logger.error(f"[MONGO ERROR] Could not create report: {e}")
+        return JsonResponse({"error": "Report storage unavailable"}, status=503)
 
     try:
-        generate_report(
+        generate_report.delay(
             report_id,
             token,
             method,
             max_posts,
-            user_id=None
+            user_id=None,
+            incremental=incremental,
         )
     except Exception as e:
         logger.error(f"Celery dispatch failed: {e}")
+        try:
+            reports_collection.update_one(
+                {"report_id": report_id},
+                {"$set": {"status": "failed", "error": "Report queue unavailable"}}
+            )
+        except Exception as e:
+            logger.error(f"[MONGO ERROR] {e}")
         return JsonResponse({"error": "Report queue unavailable"}, status=503)
 
     return JsonResponse({
@@ -300,31 +431,105 @@ def get_reports(request):
     if not profile_id:
         return JsonResponse({"reports": []})
 
-    reports = list(
-        reports_collection
-        .find({"profile_id": profile_id})
-        .sort("created_at", -1)
-    )
-
-    for r in reports:
-        r["_id"] = str(r["_id"])
+    try:
+        limit = int(request.GET.get("limit", DEFAULT_PAGE_SIZE))
+        reports, next_cursor = list_reports(
+            profile_id, limit, request.GET.get("after"), request.GET.get("order", "desc")
+        )
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
 
-    return JsonResponse({"reports": reports})
+    return JsonResponse({"reports": reports, "next": next_cursor})
 
 
 @csrf_exempt
 def get_report(request, report_id):
-    report = reports_collection.find_one({"report_id": report_id})
+    """
+    The report header with all of its insights, as before insights
+    were paged. ``?insights=page&insights_page=N`` returns one page of
+    INSIGHT_PAGE_SIZE insights (``insights_page`` alone implies it) and
+    ``?insights=none`` only the header.
+    """
+    report = reports_collection.find_one({"report_id": report_id}, {"insights": 0, "metricsState": 0})
     if not report:
         return JsonResponse({"error": "Report not found"}, status=404)
 
+    mode = request.GET.get("insights", "page" if "insights_page" in request.GET else "all")
+    if mode == "page":
+        try:
+            page = max(0, int(request.GET.get("insights_page", 0)))
+        except ValueError:
+            return JsonResponse({"error": "insights_page must be an integer"}, status=400)
+        report["insights"] = load_insights(report, page)
+        report["insights_page"] = page
+    elif mode != "none":
+        report["insights"] = load_insights(report)
+
+    # Insights analyzed in multilingual mode are translated on request only
+    if request.GET.get("translate") in ("1", "true"):
+        from .translation import fill_translations
+
+        fill_translations(report.get("insights") or [])
+
     report["_id"] = str(report["_id"])
     return JsonResponse(report)
 
+@staff_member_required
+def analysis_cache_stats(request):
+    from .analysis_cache import cache_stats
+
+    return JsonResponse(cache_stats())
+
+@staff_member_required
+def recommendation_cache_stats(request):
+    from .recommendations import recommendation_cache_stats as stats
+
+    return JsonResponse(stats())
+
+def mongo_health(request):
+    from .mongo_client import health_check
+
+    health = health_check()
+    return JsonResponse(health, status=200 if health["ok"] else 503)
+
+@staff_member_required
+def cascade_stats(request):
+    from .cascade import cascade_stats as stats
+
+    return JsonResponse(stats())
+
+def get_report_status(request, report_id):
+    """
+    Lightweight polling endpoint. Returns only status and progress and
+    answers 304 when the client's ETag is still current.
+    """
+    report = reports_collection.find_one(
+        {"report_id": report_id},
+        {"_id": 0, "report_id": 1, "status": 1, "progress": 1, "error": 1,
+         "recommendations_status": 1,
+         "created_at": 1, "updated_at": 1, "completed_at": 1},
+    )
+    if not report:
+        return JsonResponse({"error": "Report not found"}, status=404)
+
+    payload = json.dumps(report, default=str, sort_keys=True)
+    etag = '"%s"' % hashlib.md5(payload.encode()).hexdigest()
+
+    if etag in request.headers.get("If-None-Match", ""):
+        response = HttpResponse(status=304)
+    else:
+        response = HttpResponse(payload, content_type="application/json")
+
+    response["ETag"] = etag
+    response["Cache-Control"] = "no-cache"
+    if report.get("updated_at"):
+        response["Last-Modified"] = http_date(report["updated_at"].replace(tzinfo=timezone.utc).timestamp())
+    return response
+
 @csrf_exempt
 def ping_facebook(request):
     try:
-        r = requests.get("https://graph.facebook.com", timeout=5)
+        r = http_transport.get("https://graph.facebook.com", retries=0)
         return JsonResponse({"status": r.status_code})
     except Exception as e:
         return JsonResponse({"error": str(e)}, status=500)
@@ -1,8 +1,64 @@
 
-import React, { useEffect, useState } from "react";
+import React, { useEffect, useRef, useState } from "react";
 import axios from "axios";
 import Cookies from "js-cookie";
 
+// Reads the NDJSON stream from /insights/analyze/stream/ and reports the
+// profile and each insight as soon as the backend emits them. Metrics come
+// next, then the recommendation text a chunk at a time.
+async function streamAnalysis(url, token, { onProfile, onInsight, onMetrics, onRecommendation }) {
+  const response = await fetch(url, {
+    headers: { Authorization: `Bearer ${token}` },
+    credentials: "include",
+  });
+
+  if (!response.ok || !response.body) {
+    const error = new Error(`Server Error: ${response.status}`);
+    error.response = { status: response.status };
+    throw error;
+  }
+
+  const result = { profile: null, insights: [], insightMetrics: [], recommendations: "" };
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = "";
+
+  const handleLine = (line) => {
+    if (!line.trim()) return;
+    const { event, data } = JSON.parse(line);
+    if (event === "profile") {
+      result.profile = data;
+      onProfile?.(data);
+    } else if (event === "insight") {
+      result.insights.push(data);
+      onInsight?.(data);
+    } else if (event === "metrics") {
+      result.insightMetrics = data.insightMetrics || [];
+      result.recommendations = data.recommendations || "";
+      onMetrics?.({ ...result, insights: [...result.insights] });
+    } else if (event === "recommendation") {
+      result.recommendations += data.delta;
+      onRecommendation?.(result.recommendations);
+    } else if (event === "recommendations") {
+      result.recommendations = data.recommendations || "";
+    } else if (event === "error") {
+      throw new Error(data.details || data.error);
+    }
+  };
+
+  for (;;) {
+    const { value, done } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+    const lines = buffer.split("\n");
+    buffer = lines.pop();
+    lines.forEach(handleLine);
+  }
+  handleLine(buffer);
+
+  return result;
+}
+
 export default function AnalyzeToken({ token: propToken, method = "ml", onInsightsFetched }) {
   const [loading, setLoading] = useState(true);
   const [insights, setInsights] = useState([]);
@@ -11,6 +67,11 @@ export default function AnalyzeToken({ token: propToken, method = "ml", onInsigh
 
   const BACKEND_URL = "http://localhost:8000";
 
+  // Called several times per analysis (metrics, then each recommendation
+  // chunk); a ref keeps a changing callback from restarting the fetch.
+  const onInsightsFetchedRef = useRef(onInsightsFetched);
+  onInsightsFetchedRef.current = onInsightsFetched;
+
   useEffect(() => {
     const token = propToken || Cookies.get("fb_token");
     if (!token) {
@@ -30,7 +91,7 @@ export default function AnalyzeToken({ token: propToken, method = "ml", onInsigh
           setProfile(parsed.profile || null);
           setInsights(parsed.insights || []);
           
-          if (onInsightsFetched) onInsightsFetched(parsed);
+          onInsightsFetchedRef.current?.(parsed);
           
           setLoading(false);
           return;
@@ -40,19 +101,41 @@ export default function AnalyzeToken({ token: propToken, method = "ml", onInsigh
         Cookies.remove("fb_insights"); 
       }
 
+      const toFinalData = (data) => {
+        const fetchedInsights = Array.isArray(data?.insights) ? data.insights : [];
+        return {
+          profile: data?.profile || null,
+          insights: fetchedInsights,
+          totalPosts: fetchedInsights.filter(i => i?.type === "post").length,
+          totalComments: fetchedInsights.filter(i => i?.type === "comment").length,
+          insightMetrics: data?.insightMetrics || [],
+          recommendations: data?.recommendations || ""
+        };
+      };
+
       try {
-        
-        const res = await axios.get(`${BACKEND_URL}/insights/analyze/`, {
-          params: { 
-            method, 
-            max_posts: 5,
-            token: token
-          },
-          headers: { 
-            Authorization: `Bearer ${token}` 
-          },
-          withCredentials: true,
-        });
+        // Metrics are shown as soon as they arrive; the recommendation
+        // text is filled in while it streams.
+        let shown = null;
+        const data = await streamAnalysis(
+          `${BACKEND_URL}/insights/analyze/stream/?${new URLSearchParams({ method, max_posts: 5, token })}`,
+          token,
+          {
+            onProfile: (profileData) => {
+              setProfile(profileData);
+              setLoading(false);
+            },
+            onInsight: (insight) => setInsights((prev) => [...prev, insight]),
+            onMetrics: (partial) => {
+              shown = toFinalData(partial);
+              onInsightsFetchedRef.current?.(shown);
+            },
+            onRecommendation: (text) => {
+              if (shown) onInsightsFetchedRef.current?.({ ...shown, recommendations: text });
+            },
+          }
+        );
+        const res = { data };
 
 
         console.log("✅ Raw backend response:", res.data);
@@ -62,23 +145,10 @@ export default function AnalyzeToken({ token: propToken, method = "ml", onInsigh
           throw new Error("NGROK_ISSUE"); 
         }
 
-        const profileData = res.data?.profile || null;
-        const fetchedInsights = Array.isArray(res.data?.insights) ? res.data.insights : [];
+        const finalData = toFinalData(res.data);
 
-        setProfile(profileData);
-        setInsights(fetchedInsights);
-
-        const totalPosts = fetchedInsights.filter(i => i?.type === "post").length;
-        const totalComments = fetchedInsights.filter(i => i?.type === "comment").length; 
-
-        const finalData = {
-          profile: profileData,
-          insights: fetchedInsights,
-          totalPosts,
-          totalComments,
-          insightMetrics: res.data?.insightMetrics || [],
-          recommendations: res.data?.recommendations || []
-        };
+        setProfile(finalData.profile);
+        setInsights(finalData.insights);
 
         console.log("✅ Processed insights data (finalData):", finalData);
 
@@ -88,7 +158,7 @@ export default function AnalyzeToken({ token: propToken, method = "ml", onInsigh
           secure: window.location.protocol === "https:",
         });
 
-        if (onInsightsFetched) onInsightsFetched(finalData);
+        onInsightsFetchedRef.current?.(finalData);
         try {
           await axios.post(
             `${BACKEND_URL}/insights/request-report/`,
@@ -116,7 +186,7 @@ export default function AnalyzeToken({ token: propToken, method = "ml", onInsigh
     };
 
     fetchData();
-  }, [method, propToken, onInsightsFetched]); 
+  }, [method, propToken]);
 
   if (loading) {
     return (
@@ -1,4 +1,4 @@
-import React, { useEffect, useMemo, useRef, useState } from "react";
+import React, { useEffect, useRef, useState } from "react";
 import axios from "axios";
 import AnalyzeToken from "../components/AnalyzeToken";
 import * as htmlToImage from "html-to-image";
@@ -14,41 +14,53 @@ export default function ReportsPage({ token }) {
   const [selectedReport, setSelectedReport] = useState(null);
   const [isModalOpen, setIsModalOpen] = useState(false);
   const [sortOrder, setSortOrder] = useState("newest");
-  const [currentPage, setCurrentPage] = useState(1);
+  const [currentPage, setCurrentPage] = useState(0);
   const [pageSize, setPageSize] = useState(5);
+  // The server sorts and pages; cursors[n] is the "after" that opens page n
+  const [cursors, setCursors] = useState([null]);
+  const [nextCursor, setNextCursor] = useState(null);
 
   const reportRef = useRef(null);
+  const after = cursors[currentPage];
 
   useEffect(() => {
     if (!profile?.id) return;
+    let cancelled = false;
     axios
       .get(`${BACKEND_URL}/insights/reports/`, {
-        params: { profile_id: String(profile.id) },
+        params: {
+          profile_id: String(profile.id),
+          limit: pageSize,
+          order: sortOrder === "oldest" ? "asc" : "desc",
+          ...(after && { after }),
+        },
         withCredentials: true,
       })
-      .then((res) => setReports(res.data?.reports || []));
-  }, [profile?.id]);
+      .then((res) => {
+        if (cancelled) return;
+        setReports(res.data?.reports || []);
+        setNextCursor(res.data?.next || null);
+      });
+    return () => {
+      cancelled = true;
+    };
+  }, [profile?.id, sortOrder, pageSize, after]);
 
-  const processedReports = useMemo(() => {
-    const list = [...reports];
-    list.sort((a, b) =>
-      sortOrder === "newest"
-        ? new Date(b.created_at) - new Date(a.created_at)
-        : new Date(a.created_at) - new Date(b.created_at)
-    );
-    return list;
-  }, [reports, sortOrder]);
+  const resetPages = () => {
+    setCursors([null]);
+    setCurrentPage(0);
+  };
 
-  const totalPages = Math.ceil(processedReports.length / pageSize);
-  const paginatedReports = processedReports.slice(
-    (currentPage - 1) * pageSize,
-    currentPage * pageSize
-  );
+  const nextPage = () => {
+    setCursors((prev) => [...prev.slice(0, currentPage + 1), nextCursor]);
+    setCurrentPage((p) => p + 1);
+  };
 
   const fetchReport = async (id) => {
     const res = await axios.get(
       `${BACKEND_URL}/insights/reports/${id}/`,
-      { withCredentials: true }
+      // Only the metrics and recommendations are shown here
+      { params: { insights: "none" }, withCredentials: true }
     );
     setSelectedReport(res.data);
     setIsModalOpen(true);
@@ -95,7 +107,7 @@ export default function ReportsPage({ token }) {
               value={sortOrder}
               onChange={(e) => {
                 setSortOrder(e.target.value);
-                setCurrentPage(1);
+                resetPages();
               }}
               className="border rounded-lg px-4 py-2 text-sm"
             >
@@ -107,7 +119,7 @@ export default function ReportsPage({ token }) {
               value={pageSize}
               onChange={(e) => {
                 setPageSize(Number(e.target.value));
-                setCurrentPage(1);
+                resetPages();
               }}
               className="border rounded-lg px-4 py-2 text-sm"
             >
@@ -133,7 +145,7 @@ export default function ReportsPage({ token }) {
             </thead>
 
             <tbody>
-              {paginatedReports.map((r, i) => {
+              {reports.map((r, i) => {
                 const metrics = Object.fromEntries(
                   (r.insightMetrics || []).map((m) => [m.title, m.value])
                 );
@@ -141,7 +153,7 @@ export default function ReportsPage({ token }) {
                 return (
                   <tr key={r.report_id} className="border-t hover:bg-slate-50">
                     <td className="px-4 py-3">
-                      {(currentPage - 1) * pageSize + i + 1}
+                      {currentPage * pageSize + i + 1}
                     </td>
                     <td className="px-4 py-3 whitespace-nowrap">
                       {new Date(r.created_at).toLocaleDateString("en-US", {
@@ -177,33 +189,23 @@ export default function ReportsPage({ token }) {
           </table>
         </div>
 
-        {totalPages > 1 && (
+        {(currentPage > 0 || nextCursor) && (
           <div className="mt-6 flex justify-center gap-2">
             <button
-              disabled={currentPage === 1}
+              disabled={currentPage === 0}
               onClick={() => setCurrentPage((p) => p - 1)}
               className="px-4 py-2 border rounded disabled:opacity-40"
             >
               Prev
             </button>
 
-            {[...Array(totalPages)].map((_, i) => (
-              <button
-                key={i}
-                onClick={() => setCurrentPage(i + 1)}
-                className={`px-4 py-2 rounded ${
-                  currentPage === i + 1
-                    ? "bg-indigo-600 text-white"
-                    : "border"
-                }`}
-              >
-                {i + 1}
-              </button>
-            ))}
+            <span className="px-4 py-2 rounded bg-indigo-600 text-white">
+              {currentPage + 1}
+            </span>
 
             <button
-              disabled={currentPage === totalPages}
-              onClick={() => setCurrentPage((p) => p + 1)}
+              disabled={!nextCursor}
+              onClick={nextPage}
               className="px-4 py-2 border rounded disabled:opacity-40"
             >
               Next
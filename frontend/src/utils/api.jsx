@@ -2,6 +2,10 @@ import axios from 'axios';
 
 const API_BASE = "http://localhost:8000";
 
+// analyze/ leaves recommendations to recommendations/stream/ unless
+// asked for them inline; callers of this helper expect them in the response.
 export function fetchInsights(token) {
-  return axios.get(`${API_BASE}/insights/analyze?token=${token}`);
+  return axios.get(`${API_BASE}/insights/analyze/`, {
+    params: { token, recommendations: "inline" },
+  });
 }
\ No newline at end of file